@@ -2,37 +2,76 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
+import hashlib
+import math
+import os
 import random
+import tempfile
+import threading
+from dataclasses import asdict
 
 import uvicorn
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
-from ragcoach.infrastructure.db import QdrantService, pdf_to_json
-from ragcoach.main import build_grader, build_rag_evaluator
+from ragcoach.infrastructure.db import (
+    ChunkTextMissingError,
+    ExtractionReport,
+    IngestRegistry,
+    PageCache,
+    PdfExtractionError,
+    QdrantService,
+    get_extractor,
+    iter_pdf_pages,
+    write_pages_jsonl,
+)
+from ragcoach.infrastructure.db.page_cache import DEFAULT_PAGE_CACHE
+from ragcoach.infrastructure.paths import DATA_DIR
+from ragcoach.infrastructure.profiling import install_profiling, profiled
+from ragcoach.application.ports import LLMOverloadedError
+from ragcoach.application.use_cases import parse_grade
+from ragcoach.main import build_grader, build_rag_evaluator, get_llm_scheduler
 
 
-BASE_DIR = Path(__file__).resolve().parents[2]
 FRONTEND_DIR = Path(__file__).resolve().parent / "application" / "frontend"
-UPLOAD_DIR = BASE_DIR / "data" / "uploads"
-JSON_DIR = BASE_DIR / "data" / "json"
-QUESTIONS_PATH = BASE_DIR / "data" / "questions.txt"
+UPLOAD_DIR = DATA_DIR / "uploads"
+JSON_DIR = DATA_DIR / "json"
+QUESTIONS_PATH = DATA_DIR / "questions.txt"
+REGISTRY_PATH = DATA_DIR / "ingest_registry.sqlite"
+UPLOAD_CHUNK_BYTES = 1024 * 1024
 
 service = QdrantService()
+registry = IngestRegistry(REGISTRY_PATH)
+# None uses the process-wide page cache in PDF_PAGE_CACHE_PATH.
+page_cache: PageCache | None = None
+use_page_cache = DEFAULT_PAGE_CACHE
+_collection_services: dict[str, QdrantService] = {}
+_collection_services_lock = threading.Lock()
 grader = build_grader()
 evaluator = build_rag_evaluator()
 app = FastAPI(title="RAGCoach API")
+install_profiling(app)
 
 if FRONTEND_DIR.exists():
     app.mount("/static", StaticFiles(directory=FRONTEND_DIR / "static"), name="static")
 
 
+@app.exception_handler(LLMOverloadedError)
+async def llm_overloaded(request: Request, exc: LLMOverloadedError):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+
 class IngestRequest(BaseModel):
-    json_path: str = Field(..., description="Path to pdf_to_json output")
+    json_path: str = Field(..., description="Path to pdf_to_json (.json) or pdf_to_jsonl (.jsonl) output")
     source_name: Optional[str] = Field(None, description="Optional name for source id")
+    collection: Optional[str] = Field(None, description="Target collection (defaults to QDRANT_COLLECTION)")
 
 
 class SearchRequest(BaseModel):
@@ -41,18 +80,70 @@ class SearchRequest(BaseModel):
         None, description="Path to file; first non-empty line will be used if question is omitted"
     )
     top_k: int = Field(5, ge=1, le=20, description="How many results to return")
+    sources: Optional[list[str]] = Field(None, description="Only return chunks from these sources")
+    collection: Optional[str] = Field(None, description="Collection to search (defaults to QDRANT_COLLECTION)")
+    include_text: bool = Field(True, description="False returns metadata only (id, score, source, page, chunk_id)")
 
 
 class GradeRequest(BaseModel):
     question: str = Field(..., description="Exam question text")
     student_answer: str = Field(..., description="Learner answer to grade")
     lecture_snippet: Optional[str] = Field(None, description="Optional lecture context")
+    fast: bool = Field(
+        False, description="Score-only mode: capped JSON generation, result is {score, explanation, manipulation_warning}"
+    )
+    priority: Optional[Literal["interactive", "batch"]] = Field(
+        None, description="LLM queue to use; defaults to batch for fast grading and interactive otherwise"
+    )
 
 
 class PromptRequest(BaseModel):
     prompt: str = Field(..., description="Free-form prompt to send to LLM")
 
 
+def get_service(collection: str | None = None) -> QdrantService:
+    """Service for a course collection; all of them share the default service's embedder."""
+    name = (collection or "").strip()
+    if not name or name == service.collection:
+        return service
+    with _collection_services_lock:
+        scoped = _collection_services.get(name)
+        if scoped is None:
+            scoped = QdrantService(
+                collection=name,
+                embedding_model=service.embedding_model,
+                qdrant_url=service.qdrant_url,
+                qdrant_api_key=service.api_key,
+                embedder=service.embedder,
+                dedup_index=service.dedup_index_path,
+                chunk_store_path=service.chunk_store_path,
+                collection_versions=service.collection_versions,
+            )
+            _collection_services[name] = scoped
+        return scoped
+
+
+async def save_upload(file: UploadFile, directory: Path) -> tuple[Path, str]:
+    """Stream an upload into ``directory`` and return ``(path, sha256)``.
+
+    Every upload gets its own temp file and is stored under its digest, so concurrent
+    uploads with the same client filename never touch each other's bytes.
+    """
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(dir=directory, prefix=".upload-", suffix=".part", delete=False) as out:
+        tmp_path = Path(out.name)
+    try:
+        with tmp_path.open("wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                digest.update(chunk)
+                out.write(chunk)
+        dest = directory / f"{digest.hexdigest()}.pdf"
+        os.replace(tmp_path, dest)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return dest, digest.hexdigest()
+
+
 @app.get("/", response_class=HTMLResponse)
 def index():
     if not FRONTEND_DIR.exists():
@@ -65,16 +156,19 @@ def index():
 
 @app.post("/ingest")
 @app.post("/api/ingest")
+@profiled()
 def ingest(body: IngestRequest):
     path = Path(body.json_path)
     if not path.exists():
         raise HTTPException(status_code=404, detail=f"File not found: {body.json_path}")
-    inserted = service.ingest_json(json_path=path, source_name=body.source_name)
-    return {"inserted": inserted}
+    target = get_service(body.collection)
+    report = target.ingest_pages(target.load_pages(path), source=body.source_name or path.stem)
+    return {**asdict(report), "dropped": report.dropped}
 
 
 @app.post("/search")
 @app.post("/api/search")
+@profiled()
 def search(body: SearchRequest):
     if not body.question and not body.question_path:
         raise HTTPException(status_code=400, detail="Provide either 'question' or 'question_path'")
@@ -82,24 +176,31 @@ def search(body: SearchRequest):
         question = body.question
     else:
         try:
-            question = service.load_question_from_file(body.question_path or "data/questions.txt")
+            question = QdrantService.load_question_from_file(body.question_path or "data/questions.txt")
         except (FileNotFoundError, ValueError) as exc:
             raise HTTPException(status_code=404, detail=str(exc)) from exc
 
     try:
-        hits = service.search(question, top_k=body.top_k)
+        hits = get_service(body.collection).search(
+            question, top_k=body.top_k, sources=body.sources, include_text=body.include_text
+        )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except ChunkTextMissingError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
     return {"question": question, "results": hits}
 
 
 @app.post("/api/upload_pdf")
+@profiled()
 async def upload_pdf(
     file: UploadFile | None = File(None),
     files: list[UploadFile] | None = File(None),
     source_name: Optional[str] = Form(None),
     chunk_words: int = Form(150),
     clear_collection: bool = Form(False),
+    collection: Optional[str] = Form(None),
+    pdf_backend: Optional[str] = Form(None),
 ):
     """Backward-compatible: принимает file или files[]."""
     merged: list[UploadFile] = []
@@ -110,21 +211,33 @@ async def upload_pdf(
     if not merged:
         raise HTTPException(status_code=400, detail="Прикрепите PDF (поле file или files)")
     results = await upload_pdfs(
-        files=merged, source_name=source_name, chunk_words=chunk_words, clear_collection=clear_collection
+        files=merged,
+        source_name=source_name,
+        chunk_words=chunk_words,
+        clear_collection=clear_collection,
+        collection=collection,
+        pdf_backend=pdf_backend,
     )
     first = results.get("files", [])[0] if results.get("files") else {}
     return {"uploaded": first.get("name"), "json_path": first.get("json_path"), "inserted": first.get("inserted")}
 
 
 @app.post("/api/upload_pdfs")
+@profiled()
 async def upload_pdfs(
     files: list[UploadFile] | None = File(None),
     source_name: Optional[str] = Form(None),
     chunk_words: int = Form(150),
     clear_collection: bool = Form(False),
+    collection: Optional[str] = Form(None),
+    pdf_backend: Optional[str] = Form(None),
 ):
     if chunk_words <= 0:
         raise HTTPException(status_code=400, detail="chunk_words должен быть положительным")
+    try:
+        backend = get_extractor(pdf_backend).name
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     files = files or []
     if not files:
         raise HTTPException(status_code=400, detail="Не переданы файлы")
@@ -132,40 +245,88 @@ async def upload_pdfs(
     UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
     JSON_DIR.mkdir(parents=True, exist_ok=True)
 
+    target = get_service(collection)
     if clear_collection:
-        service.clear_collection()
+        target.clear_collection()
+        registry.forget_collection(target.collection)
 
-    service.chunk_words = chunk_words or service.chunk_words
     results: list[dict] = []
     for file in files:
         if not file.filename.lower().endswith(".pdf"):
             results.append({"name": file.filename, "error": "Файл не PDF"})
             continue
 
-        pdf_path = UPLOAD_DIR / file.filename
-        pdf_path.write_bytes(await file.read())
-
-        json_path = JSON_DIR / f"{Path(file.filename).stem}.json"
-        ok = pdf_to_json(str(pdf_path), str(json_path))
-        if not ok:
-            results.append({"name": file.filename, "error": "Не удалось извлечь текст"})
+        filename = Path(file.filename).name
+        source = source_name or Path(filename).stem
+        pdf_path, digest = await save_upload(file, UPLOAD_DIR)
+
+        duplicate = registry.is_ingested(target.collection, digest, source, chunk_words, pdf_backend=backend)
+        if duplicate and not target.point_count():
+            # Dropped or recreated outside this API (ingest_lectures, snapshot import, ...): stale entries.
+            registry.forget_collection(target.collection)
+            duplicate = False
+        if duplicate:
+            previous = registry.get(target.collection, digest) or {}
+            results.append(
+                {
+                    "name": file.filename,
+                    "json_path": previous.get("json_path"),
+                    "inserted": 0,
+                    "duplicate": True,
+                    "sha256": digest,
+                    "collection": target.collection,
+                    "chunk_words": chunk_words,
+                }
+            )
             continue
 
+        # Keyed like the upload itself; the text also depends on the extractor.
+        json_path = JSON_DIR / f"{digest}-{backend}.jsonl"
+        extraction = ExtractionReport()
+        pages = write_pages_jsonl(
+            iter_pdf_pages(
+                str(pdf_path),
+                backend=backend,
+                report=extraction,
+                cache=page_cache,
+                use_cache=use_page_cache,
+                digest=digest,
+            ),
+            str(json_path),
+        )
         try:
-            inserted = service.ingest_json(
-                json_path=json_path,
-                source_name=source_name or Path(file.filename).stem,
+            report = target.ingest_pages(
+                pages,
+                source=source,
+                chunk_words=chunk_words,
+            )
+            registry.record(
+                target.collection,
+                digest,
+                name=file.filename,
+                source=source,
                 chunk_words=chunk_words,
+                json_path=str(json_path),
+                inserted=report.inserted,
+                pdf_backend=backend,
             )
             results.append(
                 {
                     "name": file.filename,
                     "json_path": str(json_path),
-                    "inserted": inserted,
-                    "collection": service.collection,
-                    "chunk_words": service.chunk_words,
+                    "inserted": report.inserted,
+                    "dropped_duplicates": report.dropped,
+                    "skipped_pages": report.skipped_pages,
+                    "sha256": digest,
+                    "collection": target.collection,
+                    "chunk_words": chunk_words,
+                    "pdf_backend": backend,
+                    "cached_pages": extraction.cached_pages,
+                    "page_errors": [asdict(error) for error in extraction.errors],
                 }
             )
+        except PdfExtractionError as exc:
+            results.append({"name": file.filename, "error": "Не удалось извлечь текст", "detail": str(exc)})
         except ValueError as exc:
             results.append({"name": file.filename, "error": str(exc)})
 
@@ -204,16 +365,27 @@ def random_question():
 
 
 @app.post("/api/grade")
+@profiled()
 async def grade_answer(body: GradeRequest):
-    result = await grader(body.question, body.student_answer, body.lecture_snippet)
-    return {"result": result}
+    batch = body.priority == "batch" if body.priority else body.fast
+    if body.fast:
+        parsed = await grader.fast(body.question, body.student_answer, body.lecture_snippet, batch=batch)
+        return {"result": asdict(parsed)}
+    result = await grader(body.question, body.student_answer, body.lecture_snippet, batch=batch)
+    return {"result": result, "parsed": asdict(parse_grade(result))}
 
 
 @app.post("/api/evaluate")
+@profiled()
 async def evaluate_prompt(body: PromptRequest):
     result = await evaluator(body.prompt)
     return {"result": result}
 
 
+@app.get("/api/llm/metrics")
+def llm_metrics():
+    return get_llm_scheduler().metrics()
+
+
 if __name__ == "__main__":
     uvicorn.run("ragcoach.api:app", host="0.0.0.0", port=8000, reload=False)
@@ -103,7 +103,9 @@ if (uploadForm) {
       const lines = (data.files || []).map((f) =>
         f.error
           ? `❌ ${f.name}: ${f.error}`
-          : `✅ ${f.name}: чанков ${f.inserted}, коллекция ${f.collection}`
+          : f.duplicate
+          ? `♻️ ${f.name}: уже проиндексирован, коллекция ${f.collection}`
+          : `✅ ${f.name}: чанков ${f.inserted}, дубликатов отброшено ${f.dropped_duplicates || 0}, коллекция ${f.collection}`
       );
       uploadStatus.textContent = lines.join("\n") || "Готово";
       showToast("Загрузка завершена", "success");
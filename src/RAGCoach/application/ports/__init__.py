@@ -1,3 +1,3 @@
-from .llm_gateway import LLMGateway
+from .llm_gateway import LLMGateway, LLMOverloadedError
 
-__all__ = ["LLMGateway"]
\ No newline at end of file
+__all__ = ["LLMGateway", "LLMOverloadedError"]
\ No newline at end of file
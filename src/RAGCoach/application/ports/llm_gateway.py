@@ -1,7 +1,23 @@
 from abc import ABC, abstractmethod
 
 
+class LLMOverloadedError(RuntimeError):
+    """The LLM cannot take the call in time; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class LLMGateway(ABC):
     @abstractmethod
-    async def generate(self, prompt: str) -> str:
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        max_tokens: int | None = None,
+        stop: list[str] | None = None,
+        json_format: bool = False,
+    ) -> str:
+        """Return the completion; ``max_tokens``/``stop``/``json_format`` tighten generation when set."""
         pass
@@ -1,4 +1,4 @@
 from .evaluate_with_rag import EvaluateWithRagUseCase
-from .grade_answer import GradeAnswerUseCase
+from .grade_answer import GradeAnswerUseCase, GradeResult, parse_grade
 
-__all__ = ["EvaluateWithRagUseCase", "GradeAnswerUseCase"]
+__all__ = ["EvaluateWithRagUseCase", "GradeAnswerUseCase", "GradeResult", "parse_grade"]
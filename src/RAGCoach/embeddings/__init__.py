@@ -1,3 +1,14 @@
 from .model import EmbeddingModel
+from .pool import EmbeddingPool
+from .projection import CompactProjection
+from .registry import get_embedding_model
+from .remote import EmbeddingServerError, RemoteEmbeddingModel
 
-__all__ = ["EmbeddingModel"]
\ No newline at end of file
+__all__ = [
+    "EmbeddingModel",
+    "EmbeddingPool",
+    "CompactProjection",
+    "EmbeddingServerError",
+    "RemoteEmbeddingModel",
+    "get_embedding_model",
+]
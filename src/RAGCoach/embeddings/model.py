@@ -1,16 +1,71 @@
-from sentence_transformers import SentenceTransformer
+from __future__ import annotations
+
+import os
+import threading
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+# float16 halves embedding memory during ingest, but vectors are rounded to fp16 precision
+# (~3 significant digits) before upsert; Qdrant stores them as float32 without the lost bits.
+DEFAULT_EMBEDDING_DTYPE = os.getenv("EMBEDDING_DTYPE", "float32")
+
+
+def as_vector_matrix(vectors, dtype: str | np.dtype = DEFAULT_EMBEDDING_DTYPE) -> np.ndarray:
+    """Coerce embeddings to a C-contiguous 2-D array, copying only when dtype or layout differ."""
+    matrix = np.asarray(vectors, dtype=dtype)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1) if matrix.size else matrix.reshape(0, 0)
+    return np.ascontiguousarray(matrix)
+
 
 class EmbeddingModel:
-    def __init__(self, model_name: str = "intfloat/e5-base"):
-        self.model = SentenceTransformer(model_name)
+    def __init__(
+        self,
+        model_name: str = "intfloat/e5-base",
+        device: str | None = None,
+        backend: str | None = None,
+        dtype: str = DEFAULT_EMBEDDING_DTYPE,
+    ):
+        self.model_name = model_name
+        self.device = device
+        self.backend = backend
+        self.dtype = np.dtype(dtype)
+        self._model: SentenceTransformer | None = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def model(self) -> SentenceTransformer:
+        # Loaded on first use so importing the API (or swapping the embedder) costs nothing.
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    # Imported here so processes that only talk to an embedding server never load torch.
+                    from sentence_transformers import SentenceTransformer
+
+                    kwargs = {}
+                    if self.device:
+                        kwargs["device"] = self.device
+                    if self.backend:
+                        kwargs["backend"] = self.backend
+                    self._model = SentenceTransformer(self.model_name, **kwargs)
+        return self._model
 
-    def encode(self, texts: list[str]) -> list[list[float]]:
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """``(len(texts), dim)`` C-contiguous array of normalised embeddings in ``self.dtype``."""
+        if not texts:
+            return np.empty((0, self.dim), dtype=self.dtype)
         embeddings = self.model.encode(
             texts,
             normalize_embeddings=True,
-            show_progress_bar=True
+            show_progress_bar=True,
+            convert_to_numpy=True,
         )
-        return embeddings.tolist()
+        return as_vector_matrix(embeddings, self.dtype)
 
     @property
     def dim(self) -> int:
@@ -0,0 +1,96 @@
+"""Multi-process bulk embedding: shards texts over worker processes with pinned thread counts."""
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .model import DEFAULT_EMBEDDING_DTYPE, as_vector_matrix
+
+
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads: int) -> None:
+    # Pin intra-op threads before torch spins up its pools, so workers don't oversubscribe cores.
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(threads)
+    global _worker_model
+    _worker_model = SentenceTransformer(model_name, device="cpu")
+
+
+def _encode_shard(texts: list[str], batch_size: int) -> np.ndarray:
+    return _worker_model.encode(
+        texts,
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+    )
+
+
+def _worker_dim(_: int) -> int:
+    return _worker_model.get_sentence_embedding_dimension()
+
+
+class EmbeddingPool:
+    """Drop-in for ``EmbeddingModel.encode`` that spreads work over ``workers`` processes.
+
+    Each worker loads its own model and runs with ``threads_per_worker`` torch threads;
+    results are merged back in input order. Use as a context manager or call ``close()``.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "intfloat/e5-base",
+        workers: int | None = None,
+        threads_per_worker: int = 1,
+        shard_size: int = 64,
+        batch_size: int = 32,
+        dtype: str = DEFAULT_EMBEDDING_DTYPE,
+    ):
+        self.model_name = model_name
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.threads_per_worker = max(1, threads_per_worker)
+        self.shard_size = max(1, shard_size)
+        self.batch_size = max(1, batch_size)
+        self.dtype = np.dtype(dtype)
+        # "spawn" avoids forking a parent that may already hold torch thread pools.
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name, self.threads_per_worker),
+        )
+        self._dim: int | None = None
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, self.dim), dtype=self.dtype)
+        shards = [texts[i : i + self.shard_size] for i in range(0, len(texts), self.shard_size)]
+        # Executor.map yields results in submission order, so shards come back in input order.
+        parts = list(self._executor.map(_encode_shard, shards, [self.batch_size] * len(shards)))
+        return as_vector_matrix(np.concatenate(parts), self.dtype)
+
+    @property
+    def dim(self) -> int:
+        if self._dim is None:
+            self._dim = self._executor.submit(_worker_dim, 0).result()
+        return self._dim
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "EmbeddingPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,74 @@
+"""Dimension reduction for the compact prefilter vector used by two-stage search."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+
+class CompactProjection:
+    """Linear map ``full -> compact`` followed by L2 normalisation (cosine-friendly).
+
+    Either a seeded random orthonormal projection (no fitting, reproducible from
+    ``(dim_in, dim_out, seed)``) or a PCA basis fitted offline and saved to ``.npz``.
+    Ingestion and search must use the same projection for a collection.
+    """
+
+    def __init__(self, components: np.ndarray, mean: np.ndarray | None = None) -> None:
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+        dim_in = self.components.shape[1]
+        self.mean = (
+            np.zeros(dim_in, dtype=np.float32) if mean is None else np.asarray(mean, dtype=np.float32).reshape(dim_in)
+        )
+
+    @property
+    def dim_in(self) -> int:
+        return int(self.components.shape[1])
+
+    @property
+    def dim_out(self) -> int:
+        return int(self.components.shape[0])
+
+    @classmethod
+    def random(cls, dim_in: int, dim_out: int, seed: int = 0) -> "CompactProjection":
+        if not 0 < dim_out <= dim_in:
+            raise ValueError(f"Compact dimension must be in 1..{dim_in}, got {dim_out}")
+        rng = np.random.default_rng(seed)
+        gaussian = rng.standard_normal((dim_in, dim_out))
+        basis, _ = np.linalg.qr(gaussian)
+        return cls(basis.T)
+
+    @classmethod
+    def fit_pca(cls, vectors: np.ndarray, dim_out: int) -> "CompactProjection":
+        data = np.asarray(vectors, dtype=np.float64)
+        if data.ndim != 2 or data.shape[0] < 2:
+            raise ValueError("PCA needs a 2-D matrix with at least two vectors")
+        if not 0 < dim_out <= data.shape[1]:
+            raise ValueError(f"Compact dimension must be in 1..{data.shape[1]}, got {dim_out}")
+        mean = data.mean(axis=0)
+        centered = data - mean
+        # Eigen-decomposition of the (dim x dim) covariance is cheaper than SVD of the data matrix.
+        covariance = centered.T @ centered / (data.shape[0] - 1)
+        eigvals, eigvecs = np.linalg.eigh(covariance)
+        order = np.argsort(eigvals)[::-1][:dim_out]
+        return cls(eigvecs[:, order].T, mean)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "CompactProjection":
+        with np.load(path) as data:
+            return cls(data["components"], data["mean"])
+
+    def save(self, path: str | Path) -> None:
+        np.savez(path, components=self.components, mean=self.mean)
+
+    def transform(self, vectors) -> np.ndarray:
+        data = np.asarray(vectors, dtype=np.float32)
+        single = data.ndim == 1
+        if single:
+            data = data[None, :]
+        if data.shape[1] != self.dim_in:
+            raise ValueError(f"Projection expects vectors of size {self.dim_in}, got {data.shape[1]}")
+        reduced = (data - self.mean) @ self.components.T
+        norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+        reduced /= np.where(norms == 0, 1.0, norms)
+        return reduced[0] if single else reduced
@@ -0,0 +1,47 @@
+"""Process-wide registry so every service shares one loaded model per (name, device, backend).
+
+With ``EMBEDDING_SERVER`` set, the registry hands out ``RemoteEmbeddingModel`` clients
+instead, and the model lives once in the embedding server process.
+"""
+from __future__ import annotations
+
+import os
+import threading
+
+from .model import EmbeddingModel
+from .remote import DEFAULT_EMBEDDING_SERVER, RemoteEmbeddingModel
+
+
+DEFAULT_EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE") or None
+DEFAULT_EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND") or None
+
+_models: dict[tuple[str, str | None, str | None], EmbeddingModel | RemoteEmbeddingModel] = {}
+_lock = threading.Lock()
+
+
+def get_embedding_model(
+    model_name: str,
+    device: str | None = DEFAULT_EMBEDDING_DEVICE,
+    backend: str | None = DEFAULT_EMBEDDING_BACKEND,
+    server: str | None = DEFAULT_EMBEDDING_SERVER,
+) -> EmbeddingModel | RemoteEmbeddingModel:
+    """Return the shared embedder for this key, creating it on first request.
+
+    The underlying SentenceTransformer is still loaded lazily on first ``encode``; a remote
+    client checks on first use that the server serves ``model_name``.
+    """
+    key = (model_name, None, f"remote:{server}") if server else (model_name, device, backend)
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            if server:
+                model = RemoteEmbeddingModel(server, model_name=model_name)
+            else:
+                model = EmbeddingModel(model_name, device=device, backend=backend)
+            _models[key] = model
+        return model
+
+
+def loaded_models() -> list[tuple[str, str | None, str | None]]:
+    with _lock:
+        return list(_models)
@@ -0,0 +1,149 @@
+"""Client side of the embedding sidecar (see ``server.py``); importing it does not load torch."""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import struct
+import threading
+
+import numpy as np
+
+from .model import DEFAULT_EMBEDDING_DTYPE
+
+
+# When set, get_embedding_model() hands out clients for this server instead of loading models.
+DEFAULT_EMBEDDING_SERVER = os.getenv("EMBEDDING_SERVER") or None
+DEFAULT_EMBEDDING_SERVER_ADDRESS = DEFAULT_EMBEDDING_SERVER or "unix:///tmp/ragcoach-embed.sock"
+DEFAULT_EMBEDDING_SERVER_TIMEOUT = float(os.getenv("EMBEDDING_SERVER_TIMEOUT", "60"))
+
+# Upper bound for a single frame; protects the server from garbage on the socket.
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+_LENGTH = struct.Struct(">I")
+_WIRE_DTYPE = np.dtype("<f4")
+
+
+class EmbeddingServerError(RuntimeError):
+    """The embedding server rejected a request or answered with something unexpected."""
+
+
+def parse_address(address: str) -> tuple[str, str | tuple[str, int]]:
+    """``unix:///path``, ``/path``, ``tcp://host:port`` or ``host:port`` -> (family, target)."""
+    if address.startswith("unix://"):
+        return "unix", address[len("unix://") :]
+    if address.startswith("/"):
+        return "unix", address
+    target = address[len("tcp://") :] if address.startswith("tcp://") else address
+    host, sep, port = target.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"Embedding server address must be unix:///path or tcp://host:port, got {address!r}")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+def _encode_frame(header: dict) -> bytes:
+    body = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    return _LENGTH.pack(len(body)) + body
+
+
+class RemoteEmbeddingModel:
+    """Client with the ``EmbeddingModel.encode``/``dim`` interface backed by an ``EmbeddingServer``.
+
+    Each thread keeps its own connection; a dropped connection is re-opened once per call.
+    """
+
+    def __init__(
+        self,
+        address: str = DEFAULT_EMBEDDING_SERVER_ADDRESS,
+        model_name: str | None = None,
+        timeout: float = DEFAULT_EMBEDDING_SERVER_TIMEOUT,
+        dtype: str = DEFAULT_EMBEDDING_DTYPE,
+    ):
+        self.address = address
+        self.model_name = model_name
+        self.timeout = timeout
+        self.dtype = np.dtype(dtype)
+        self._family, self._target = parse_address(address)
+        self._local = threading.local()
+        self._info: dict | None = None
+
+    def _connect(self) -> socket.socket:
+        if self._family == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            sock = socket.socket(socket.AF_INET6 if ":" in self._target[0] else socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self._target)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    @staticmethod
+    def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            count = sock.recv_into(view[received:])
+            if not count:
+                raise ConnectionError("Embedding server closed the connection")
+            received += count
+        return bytes(buffer)
+
+    def _roundtrip_once(self, request: dict) -> tuple[dict, bytes]:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = self._local.sock = self._connect()
+        try:
+            sock.sendall(_encode_frame(request))
+            (length,) = _LENGTH.unpack(self._recv_exactly(sock, _LENGTH.size))
+            header = json.loads(self._recv_exactly(sock, length))
+            body = b""
+            if header.get("ok") and header.get("rows"):
+                body = self._recv_exactly(sock, header["rows"] * header["dim"] * _WIRE_DTYPE.itemsize)
+        except BaseException:
+            # The stream may be mid-frame; never reuse it.
+            self._local.sock = None
+            sock.close()
+            raise
+        if not header.get("ok"):
+            raise EmbeddingServerError(header.get("error") or "Embedding server error")
+        return header, body
+
+    def _roundtrip(self, request: dict) -> tuple[dict, bytes]:
+        try:
+            return self._roundtrip_once(request)
+        except (ConnectionError, BrokenPipeError):
+            # Server restarted or closed an idle connection; retry once on a fresh socket.
+            return self._roundtrip_once(request)
+
+    def info(self) -> dict:
+        if self._info is None:
+            info, _ = self._roundtrip({"op": "info"})
+            if self.model_name and info.get("model") != self.model_name:
+                raise EmbeddingServerError(
+                    f"Embedding server at {self.address} serves {info.get('model')!r}, expected {self.model_name!r}"
+                )
+            self._info = info
+        return self._info
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        self.info()
+        if not texts:
+            return np.empty((0, self.dim), dtype=self.dtype)
+        header, body = self._roundtrip({"op": "encode", "texts": list(texts)})
+        matrix = np.frombuffer(body, dtype=_WIRE_DTYPE).reshape(header["rows"], header["dim"])
+        # frombuffer views the read-only reply; astype gives callers an owned, writable array.
+        return matrix.astype(self.dtype)
+
+    @property
+    def dim(self) -> int:
+        return int(self.info()["dim"])
+
+    def close(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            self._local.sock = None
+            sock.close()
@@ -0,0 +1,187 @@
+"""Embedding sidecar: one loaded model serving every API worker over a Unix or TCP socket.
+
+Wire format (both directions): a 4-byte big-endian length followed by a JSON header.
+Requests are ``{"op": "encode", "texts": [...]}`` or ``{"op": "info"}``. An encode reply
+header ``{"ok": true, "rows": n, "dim": d, "dtype": "float32"}`` is followed by the raw
+``n * d`` little-endian float32 matrix, so vectors never pass through JSON.
+
+Requests from all connections go into one queue and are encoded together, up to
+``max_batch`` texts or ``max_wait_ms`` after the first pending request.
+
+    python -m ragcoach.embeddings.server --address unix:///tmp/ragcoach-embed.sock
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .model import EmbeddingModel
+from .remote import DEFAULT_EMBEDDING_SERVER_ADDRESS, _LENGTH, _WIRE_DTYPE, MAX_FRAME_BYTES, _encode_frame, parse_address
+
+
+DEFAULT_MAX_BATCH = int(os.getenv("EMBEDDING_SERVER_MAX_BATCH", "64"))
+DEFAULT_MAX_WAIT_MS = float(os.getenv("EMBEDDING_SERVER_MAX_WAIT_MS", "5"))
+
+
+class _Batcher:
+    """Collects pending encode requests and runs them through the model in combined batches."""
+
+    def __init__(self, model: EmbeddingModel, max_batch: int, max_wait_ms: float):
+        self.model = model
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: asyncio.Queue[tuple[list[str], asyncio.Future]] = asyncio.Queue()
+        # A single thread: the model is the bottleneck and torch parallelises internally.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+
+    async def encode(self, texts: list[str]) -> np.ndarray:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future))
+        return await future
+
+    def _encode_sync(self, texts: list[str]) -> np.ndarray:
+        return np.asarray(
+            self.model.model.encode(
+                texts, normalize_embeddings=True, show_progress_bar=False, convert_to_numpy=True
+            ),
+            dtype=np.float32,
+        )
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            texts = [text for request_texts, _ in pending for text in request_texts]
+            try:
+                matrix = await loop.run_in_executor(self._executor, self._encode_sync, texts)
+            except Exception as exc:  # noqa: BLE001 - reported to every waiting client
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            offset = 0
+            for request_texts, future in pending:
+                if not future.done():
+                    future.set_result(matrix[offset : offset + len(request_texts)])
+                offset += len(request_texts)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+class EmbeddingServer:
+    def __init__(
+        self,
+        model: EmbeddingModel,
+        address: str = DEFAULT_EMBEDDING_SERVER_ADDRESS,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+    ):
+        self.model = model
+        self.address = address
+        self._batcher = _Batcher(model, max_batch, max_wait_ms)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+                except asyncio.IncompleteReadError:
+                    return
+                if length > MAX_FRAME_BYTES:
+                    writer.write(_encode_frame({"ok": False, "error": f"Frame of {length} bytes is too large"}))
+                    await writer.drain()
+                    return
+                try:
+                    request = json.loads(await reader.readexactly(length))
+                    writer.write(await self._dispatch(request))
+                except (ValueError, TypeError, KeyError, RuntimeError) as exc:
+                    writer.write(_encode_frame({"ok": False, "error": str(exc)}))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            return
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request: dict) -> bytes:
+        op = request.get("op")
+        if op == "info":
+            return _encode_frame({"ok": True, "model": self.model.model_name, "dim": self.model.dim})
+        if op != "encode":
+            raise ValueError(f"Unknown op: {op!r}")
+        texts = request["texts"]
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            raise TypeError("'texts' must be a list of strings")
+        if not texts:
+            return _encode_frame({"ok": True, "rows": 0, "dim": self.model.dim, "dtype": "float32"})
+        matrix = await self._batcher.encode(texts)
+        header = {"ok": True, "rows": int(matrix.shape[0]), "dim": int(matrix.shape[1]), "dtype": "float32"}
+        return _encode_frame(header) + np.ascontiguousarray(matrix, dtype=_WIRE_DTYPE).tobytes()
+
+    async def serve_forever(self) -> None:
+        family, target = parse_address(self.address)
+        # Load weights before listening so the first client is not the one paying for it.
+        await asyncio.get_running_loop().run_in_executor(None, lambda: self.model.model)
+        if family == "unix":
+            path = Path(target)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.unlink(missing_ok=True)
+            server = await asyncio.start_unix_server(self._handle, path=str(path))
+        else:
+            host, port = target
+            server = await asyncio.start_server(self._handle, host=host, port=port)
+        batcher_task = asyncio.create_task(self._batcher.run())
+        print(f"Embedding server for {self.model.model_name} (dim={self.model.dim}) listening on {self.address}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher_task.cancel()
+            self._batcher.close()
+            if family == "unix":
+                Path(target).unlink(missing_ok=True)
+
+
+def main() -> None:
+    from .registry import DEFAULT_EMBEDDING_BACKEND, DEFAULT_EMBEDDING_DEVICE
+
+    parser = argparse.ArgumentParser(description="Serve one embedding model to all API workers")
+    parser.add_argument("--address", default=DEFAULT_EMBEDDING_SERVER_ADDRESS, help="unix:///path or tcp://host:port")
+    parser.add_argument("--model", default=os.getenv("EMBEDDING_MODEL", "intfloat/e5-base"))
+    parser.add_argument("--device", default=DEFAULT_EMBEDDING_DEVICE)
+    parser.add_argument("--backend", default=DEFAULT_EMBEDDING_BACKEND)
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="Texts encoded together at most")
+    parser.add_argument(
+        "--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS, help="How long to wait for more requests to batch"
+    )
+    args = parser.parse_args()
+
+    model = EmbeddingModel(args.model, device=args.device, backend=args.backend)
+    server = EmbeddingServer(model, address=args.address, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
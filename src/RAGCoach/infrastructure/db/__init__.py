@@ -1,5 +1,36 @@
 from .qdrant_service import QdrantService
-from .reader_pdf import pdf_to_json
+from .chunk_store import ChunkStore, ChunkTextMissingError
+from .reader_pdf import (
+    ExtractionReport,
+    PageError,
+    PdfExtractionError,
+    iter_jsonl_pages,
+    iter_pdf_pages,
+    pdf_to_json,
+    pdf_to_jsonl,
+    write_pages_jsonl,
+)
+from .pdf_extractors import EXTRACTORS, PdfExtractor, get_extractor
+from .page_cache import PageCache
 from .lecture_json_uploader import LectureJsonUploader
+from .ingest_registry import IngestRegistry
 
-__all__ = ["pdf_to_json", "LectureJsonUploader", "QdrantService"]
+__all__ = [
+    "pdf_to_json",
+    "pdf_to_jsonl",
+    "iter_pdf_pages",
+    "iter_jsonl_pages",
+    "write_pages_jsonl",
+    "PdfExtractionError",
+    "ExtractionReport",
+    "PageError",
+    "PdfExtractor",
+    "EXTRACTORS",
+    "get_extractor",
+    "PageCache",
+    "LectureJsonUploader",
+    "IngestRegistry",
+    "ChunkStore",
+    "ChunkTextMissingError",
+    "QdrantService",
+]
@@ -0,0 +1,87 @@
+"""Local SQLite store for chunk texts, keyed by (Qdrant URL, collection, point id).
+
+With the store enabled, Qdrant payloads carry only ``source``/``page``/``chunk_id``; the
+text is read back for the final top-k hits only, so neither Qdrant RAM nor the search
+responses carry full chunk texts.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable
+
+from ..paths import DATA_DIR
+from .store_scope import ensure_scoped_table
+
+
+DEFAULT_CHUNK_STORE_PATH = os.getenv("CHUNK_STORE_PATH") or DATA_DIR / "chunk_store.sqlite"
+DEFAULT_CHUNK_STORE = os.getenv("CHUNK_STORE_ENABLED", "1").lower() not in ("0", "false", "no")
+
+# SQLite caps the number of bound parameters per statement (999 on older builds).
+_LOOKUP_BATCH = 500
+
+
+class ChunkTextMissingError(RuntimeError):
+    """Qdrant returned text-less points whose texts are not in the chunk store."""
+
+
+class ChunkStore:
+    def __init__(self, path: str | Path = DEFAULT_CHUNK_STORE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL lets several API workers read while an ingest writes.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            ensure_scoped_table(
+                self._conn,
+                "chunks",
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                "qdrant_url TEXT, collection TEXT, point_id INTEGER, text TEXT, "
+                "PRIMARY KEY (qdrant_url, collection, point_id)"
+                ") WITHOUT ROWID",
+            )
+
+    def put_many(self, qdrant_url: str, collection: str, ids: Iterable[int | str], texts: Iterable[str]) -> None:
+        rows = [(qdrant_url, collection, point_id, text) for point_id, text in zip(ids, texts)]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?)", rows)
+
+    def get_many(self, qdrant_url: str, collection: str, ids: Iterable[int | str]) -> dict[int | str, str]:
+        wanted = list(ids)
+        found: dict[int | str, str] = {}
+        with self._lock:
+            for start in range(0, len(wanted), _LOOKUP_BATCH):
+                part = wanted[start : start + _LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    "SELECT point_id, text FROM chunks "
+                    f"WHERE qdrant_url = ? AND collection = ? AND point_id IN ({placeholders})",
+                    (qdrant_url, collection, *part),
+                )
+                found.update(rows)
+        return found
+
+    def count(self, qdrant_url: str, collection: str) -> int:
+        with self._lock:
+            (total,) = self._conn.execute(
+                "SELECT COUNT(*) FROM chunks WHERE qdrant_url = ? AND collection = ?", (qdrant_url, collection)
+            ).fetchone()
+        return total
+
+    def text_bytes(self, qdrant_url: str, collection: str) -> int:
+        with self._lock:
+            (total,) = self._conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(CAST(text AS BLOB))), 0) FROM chunks WHERE qdrant_url = ? AND collection = ?",
+                (qdrant_url, collection),
+            ).fetchone()
+        return total
+
+    def forget_collection(self, qdrant_url: str, collection: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM chunks WHERE qdrant_url = ? AND collection = ?", (qdrant_url, collection)
+            )
@@ -0,0 +1,165 @@
+"""Exact and near-duplicate chunk detection backed by a persistent SQLite signature index.
+
+Exact duplicates are matched by a digest of the text with case and whitespace
+normalised; numbers are kept, so table rows or worked examples that differ only in
+their values are not exact duplicates. Near duplicates are matched by 64-bit SimHash
+over word shingles with digits folded: a chunk is dropped when an indexed
+signature of the same collection (on the same Qdrant) is within ``max_distance`` bits. Lookups use the
+pigeonhole trick: the signature is split into ``max_distance + 1`` bands, and any
+signature that close must share at least one band exactly.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+from ..paths import DATA_DIR
+from .store_scope import ensure_scoped_table
+
+
+DEFAULT_DEDUP_INDEX = os.getenv("DEDUP_INDEX_PATH") or DATA_DIR / "dedup_index.sqlite"
+DEFAULT_DEDUP_MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", "3"))
+
+SIGNATURE_BITS = 64
+# Shorter chunks have too few shingles for a meaningful SimHash; only exact matching applies.
+MIN_NEAR_DUP_TOKENS = 8
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def tokenize(text: str) -> list[str]:
+    """SimHash tokens only: digits are folded so repeated headers/footers that differ by page number match."""
+    return _TOKEN_RE.findall(_DIGITS_RE.sub("0", text.lower()))
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def text_digest(text: str) -> str:
+    return hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def simhash(tokens: list[str], shingle: int = 3) -> int:
+    if len(tokens) < shingle:
+        shingles = [" ".join(tokens)]
+    else:
+        shingles = [" ".join(tokens[i : i + shingle]) for i in range(len(tokens) - shingle + 1)]
+    weights = [0] * SIGNATURE_BITS
+    for item in shingles:
+        value = int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIGNATURE_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def _to_sqlite_int(value: int) -> int:
+    """SQLite integers are signed 64-bit."""
+    return value - (1 << SIGNATURE_BITS) if value >= 1 << (SIGNATURE_BITS - 1) else value
+
+
+def _from_sqlite_int(value: int) -> int:
+    return value + (1 << SIGNATURE_BITS) if value < 0 else value
+
+
+class ChunkDeduplicator:
+    """Classifies chunks as new, exact duplicates or near duplicates within a (Qdrant URL, collection)."""
+
+    def __init__(self, path: str | Path = DEFAULT_DEDUP_INDEX, max_distance: int = DEFAULT_DEDUP_MAX_DISTANCE):
+        self.path = Path(path)
+        self.max_distance = max(0, max_distance)
+        self.bands = self.max_distance + 1
+        self.band_bits = SIGNATURE_BITS // self.bands
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            ensure_scoped_table(
+                self._conn,
+                "exact",
+                "CREATE TABLE IF NOT EXISTS exact ("
+                "qdrant_url TEXT, collection TEXT, digest TEXT, PRIMARY KEY (qdrant_url, collection, digest))",
+            )
+            ensure_scoped_table(
+                self._conn,
+                "simhash",
+                "CREATE TABLE IF NOT EXISTS simhash ("
+                "qdrant_url TEXT, collection TEXT, band INTEGER, band_value INTEGER, signature INTEGER)",
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS simhash_band ON simhash (qdrant_url, collection, band, band_value)"
+            )
+
+    def _band_values(self, signature: int) -> list[int]:
+        mask = (1 << self.band_bits) - 1
+        return [(signature >> (band * self.band_bits)) & mask for band in range(self.bands)]
+
+    def _is_near_indexed(self, qdrant_url: str, collection: str, signature: int) -> bool:
+        for band, value in enumerate(self._band_values(signature)):
+            rows = self._conn.execute(
+                "SELECT signature FROM simhash WHERE qdrant_url = ? AND collection = ? AND band = ? AND band_value = ?",
+                (qdrant_url, collection, band, value),
+            )
+            for (stored,) in rows:
+                if bin(_from_sqlite_int(stored) ^ signature).count("1") <= self.max_distance:
+                    return True
+        return False
+
+    def classify(self, qdrant_url: str, collection: str, texts: list[str]) -> list[str | None]:
+        """Return ``"exact"``, ``"near"`` or ``None`` (keep) per text.
+
+        Duplicates inside ``texts`` are detected too; nothing is written until ``remember``.
+        """
+        verdicts: list[str | None] = []
+        batch_digests: set[str] = set()
+        batch_signatures: list[int] = []
+        with self._lock:
+            for text in texts:
+                tokens = tokenize(text)
+                digest = text_digest(text)
+                exists = self._conn.execute(
+                    "SELECT 1 FROM exact WHERE qdrant_url = ? AND collection = ? AND digest = ?",
+                    (qdrant_url, collection, digest),
+                ).fetchone()
+                if exists or digest in batch_digests:
+                    verdicts.append("exact")
+                    continue
+                batch_digests.add(digest)
+
+                if len(tokens) >= MIN_NEAR_DUP_TOKENS:
+                    signature = simhash(tokens)
+                    in_batch = any(
+                        bin(signature ^ other).count("1") <= self.max_distance for other in batch_signatures
+                    )
+                    if in_batch or self._is_near_indexed(qdrant_url, collection, signature):
+                        verdicts.append("near")
+                        continue
+                    batch_signatures.append(signature)
+                verdicts.append(None)
+        return verdicts
+
+    def remember(self, qdrant_url: str, collection: str, texts: list[str]) -> None:
+        """Index chunks that were actually stored."""
+        exact_rows = []
+        simhash_rows = []
+        for text in texts:
+            exact_rows.append((qdrant_url, collection, text_digest(text)))
+            tokens = tokenize(text)
+            if len(tokens) >= MIN_NEAR_DUP_TOKENS:
+                signature = simhash(tokens)
+                stored = _to_sqlite_int(signature)
+                for band, value in enumerate(self._band_values(signature)):
+                    simhash_rows.append((qdrant_url, collection, band, value, stored))
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO exact VALUES (?, ?, ?)", exact_rows)
+            self._conn.executemany("INSERT INTO simhash VALUES (?, ?, ?, ?, ?)", simhash_rows)
+
+    def forget_collection(self, qdrant_url: str, collection: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM exact WHERE qdrant_url = ? AND collection = ?", (qdrant_url, collection))
+            self._conn.execute("DELETE FROM simhash WHERE qdrant_url = ? AND collection = ?", (qdrant_url, collection))
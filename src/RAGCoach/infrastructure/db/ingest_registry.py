@@ -0,0 +1,89 @@
+"""Persistent registry of already ingested files, keyed by content hash."""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from ..paths import DATA_DIR
+
+
+DEFAULT_REGISTRY_PATH = os.getenv("INGEST_REGISTRY_PATH") or DATA_DIR / "ingest_registry.sqlite"
+
+
+class IngestRegistry:
+    """Remembers which (collection, sha256) pairs were ingested and with which settings.
+
+    Stored in SQLite (WAL) so every API worker sees the others' entries and duplicate
+    uploads survive restarts. Entries of the older JSON registry next to ``path``
+    (``ingest_registry.json``) are imported once.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_REGISTRY_PATH) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "collection TEXT, digest TEXT, info TEXT, PRIMARY KEY (collection, digest)"
+                ") WITHOUT ROWID"
+            )
+        self._import_legacy(self.path.with_suffix(".json"))
+
+    def _import_legacy(self, legacy_path: Path) -> None:
+        if legacy_path == self.path or not legacy_path.exists():
+            return
+        try:
+            data = json.loads(legacy_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict):
+            return
+        rows = [
+            (entry["collection"], entry["sha256"], json.dumps(entry, ensure_ascii=False))
+            for entry in data.values()
+            if isinstance(entry, dict) and "collection" in entry and "sha256" in entry
+        ]
+        with self._lock, self._conn:
+            # OR IGNORE: entries written since the migration win over the old file.
+            self._conn.executemany("INSERT OR IGNORE INTO entries VALUES (?, ?, ?)", rows)
+        try:
+            legacy_path.rename(legacy_path.with_suffix(".json.imported"))
+        except FileNotFoundError:
+            # Another worker imported it at the same time.
+            pass
+
+    def get(self, collection: str, digest: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT info FROM entries WHERE collection = ? AND digest = ?", (collection, digest)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def is_ingested(
+        self, collection: str, digest: str, source: str, chunk_words: int, pdf_backend: str | None = None
+    ) -> bool:
+        """True when identical bytes were already ingested as ``source`` with the same chunking (and PDF backend)."""
+        entry = self.get(collection, digest)
+        if not entry or entry.get("source") != source or entry.get("chunk_words") != chunk_words:
+            return False
+        # Entries written before backends were selectable were extracted with pdfplumber.
+        return pdf_backend is None or entry.get("pdf_backend", "pdfplumber") == pdf_backend
+
+    def record(self, collection: str, digest: str, **info) -> None:
+        entry = {"collection": collection, "sha256": digest, **info}
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                (collection, digest, json.dumps(entry, ensure_ascii=False)),
+            )
+
+    def forget_collection(self, collection: str) -> None:
+        """Drop every entry of a collection (call after the collection is cleared)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE collection = ?", (collection,))
@@ -0,0 +1,117 @@
+"""Persistent per-page text cache keyed by (PDF sha256, page, extraction backend).
+
+Re-uploading or re-ingesting an unchanged PDF reads its pages from here instead of
+parsing them again; only pages that were never extracted successfully hit the parser.
+Documents are evicted least recently used beyond ``max_documents``; ``prune`` also drops
+documents unused for a given number of days.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from ..paths import DATA_DIR
+
+
+DEFAULT_PAGE_CACHE_PATH = os.getenv("PDF_PAGE_CACHE_PATH") or DATA_DIR / "page_cache.sqlite"
+DEFAULT_PAGE_CACHE = os.getenv("PDF_PAGE_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+# 0 keeps every document.
+DEFAULT_PAGE_CACHE_MAX_DOCUMENTS = int(os.getenv("PDF_PAGE_CACHE_MAX_DOCUMENTS", "500"))
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_sha256(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PageCache:
+    def __init__(self, path: str | Path = DEFAULT_PAGE_CACHE_PATH, max_documents: int = DEFAULT_PAGE_CACHE_MAX_DOCUMENTS):
+        self.path = Path(path)
+        self.max_documents = max(0, max_documents)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "digest TEXT, backend TEXT, page INTEGER, text TEXT, PRIMARY KEY (digest, backend, page)"
+                ") WITHOUT ROWID"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "digest TEXT, backend TEXT, page_count INTEGER, last_used REAL, PRIMARY KEY (digest, backend)"
+                ") WITHOUT ROWID"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(documents)")}
+            if "last_used" not in columns:
+                # Caches written before eviction existed; their documents count as least recently used.
+                self._conn.execute("ALTER TABLE documents ADD COLUMN last_used REAL DEFAULT 0")
+
+    def page_count(self, digest: str, backend: str) -> int | None:
+        """Page count of a cached document (``None`` if unknown); marks the document as used."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT page_count FROM documents WHERE digest = ? AND backend = ?", (digest, backend)
+            ).fetchone()
+            if row:
+                self._conn.execute(
+                    "UPDATE documents SET last_used = ? WHERE digest = ? AND backend = ?", (time.time(), digest, backend)
+                )
+        return row[0] if row else None
+
+    def get_pages(self, digest: str, backend: str) -> dict[int, str]:
+        """Cached texts by 0-based page index."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page, text FROM pages WHERE digest = ? AND backend = ?", (digest, backend)
+            ).fetchall()
+        return dict(rows)
+
+    def put_document(self, digest: str, backend: str, page_count: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)", (digest, backend, page_count, time.time())
+            )
+            if self.max_documents:
+                self._evict(max_documents=self.max_documents)
+
+    def put_page(self, digest: str, backend: str, page: int, text: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)", (digest, backend, page, text))
+
+    def prune(self, max_documents: int | None = None, max_age_days: float | None = None) -> int:
+        """Drop least recently used documents beyond ``max_documents`` and those unused for
+        ``max_age_days``; returns how many documents were removed."""
+        with self._lock, self._conn:
+            removed = self._evict(max_documents=max_documents, max_age_days=max_age_days)
+        if removed:
+            with self._lock:
+                self._conn.execute("VACUUM")
+        return removed
+
+    def _evict(self, max_documents: int | None = None, max_age_days: float | None = None) -> int:
+        """Caller holds the lock and the transaction."""
+        stale: list[tuple[str, str]] = []
+        if max_age_days is not None:
+            cutoff = time.time() - max_age_days * 86400
+            stale += self._conn.execute(
+                "SELECT digest, backend FROM documents WHERE last_used < ?", (cutoff,)
+            ).fetchall()
+        if max_documents is not None:
+            stale += self._conn.execute(
+                "SELECT digest, backend FROM documents ORDER BY last_used DESC LIMIT -1 OFFSET ?", (max(0, max_documents),)
+            ).fetchall()
+        stale = list(dict.fromkeys(stale))
+        self._conn.executemany("DELETE FROM pages WHERE digest = ? AND backend = ?", stale)
+        self._conn.executemany("DELETE FROM documents WHERE digest = ? AND backend = ?", stale)
+        return len(stale)
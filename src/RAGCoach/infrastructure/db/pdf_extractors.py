@@ -0,0 +1,122 @@
+"""PDF text extraction backends behind one small interface.
+
+``pdfplumber`` runs full layout analysis per page; ``pdfium`` (pypdfium2, optional
+dependency) reads the text layer directly and is much faster for plain lecture slides.
+Pick one with ``PDF_BACKEND`` or per call.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from abc import ABC, abstractmethod
+
+
+DEFAULT_PDF_BACKEND = os.getenv("PDF_BACKEND", "pdfplumber")
+
+
+class PdfDocument(ABC):
+    """An open PDF; pages are addressed by 0-based index."""
+
+    page_count: int
+
+    @abstractmethod
+    def extract_text(self, index: int) -> str:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "PdfDocument":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class PdfExtractor(ABC):
+    name: str
+
+    @abstractmethod
+    def open(self, pdf_file) -> PdfDocument:
+        pass
+
+
+class _PdfplumberDocument(PdfDocument):
+    def __init__(self, pdf):
+        self._pdf = pdf
+        self.page_count = len(pdf.pages)
+
+    def extract_text(self, index: int) -> str:
+        page = self._pdf.pages[index]
+        try:
+            return page.extract_text() or ""
+        finally:
+            # Release parsed layout objects so memory does not grow with the page count.
+            if hasattr(page, "close"):
+                page.close()
+
+    def close(self) -> None:
+        self._pdf.close()
+
+
+class PdfplumberExtractor(PdfExtractor):
+    name = "pdfplumber"
+
+    def open(self, pdf_file) -> PdfDocument:
+        import pdfplumber
+
+        return _PdfplumberDocument(pdfplumber.open(pdf_file))
+
+
+# PDFium is not thread-safe; serialise every call into it within the process.
+_pdfium_lock = threading.RLock()
+
+
+class _PdfiumDocument(PdfDocument):
+    def __init__(self, pdf):
+        self._pdf = pdf
+        self.page_count = len(pdf)
+
+    def extract_text(self, index: int) -> str:
+        with _pdfium_lock:
+            page = self._pdf[index]
+            try:
+                text_page = page.get_textpage()
+                try:
+                    text = text_page.get_text_range()
+                finally:
+                    text_page.close()
+            finally:
+                page.close()
+        return text.replace("\r\n", "\n")
+
+    def close(self) -> None:
+        with _pdfium_lock:
+            self._pdf.close()
+
+
+class PdfiumExtractor(PdfExtractor):
+    name = "pdfium"
+
+    def open(self, pdf_file) -> PdfDocument:
+        try:
+            import pypdfium2
+        except ImportError as exc:
+            raise RuntimeError("PDF backend 'pdfium' needs pypdfium2: pip install ragcoach[pdfium]") from exc
+        with _pdfium_lock:
+            return _PdfiumDocument(pypdfium2.PdfDocument(str(pdf_file)))
+
+
+EXTRACTORS: dict[str, type[PdfExtractor]] = {
+    PdfplumberExtractor.name: PdfplumberExtractor,
+    PdfiumExtractor.name: PdfiumExtractor,
+}
+
+
+def get_extractor(name: str | None = None) -> PdfExtractor:
+    backend = (name or DEFAULT_PDF_BACKEND).strip().lower()
+    try:
+        return EXTRACTORS[backend]()
+    except KeyError:
+        raise ValueError(f"Unknown PDF backend '{backend}'. Available: {', '.join(EXTRACTORS)}") from None
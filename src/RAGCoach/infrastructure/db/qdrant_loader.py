@@ -7,13 +7,21 @@ import urllib.request
 from pathlib import Path
 from typing import Iterable, List, Tuple
 
+import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from ragcoach.embeddings.model import as_vector_matrix
+from ragcoach.embeddings.pool import EmbeddingPool
+from ragcoach.embeddings.registry import get_embedding_model
+
 
 DEFAULT_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
 DEFAULT_COLLECTION = os.getenv("QDRANT_COLLECTION", "lectures")
 QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333").rstrip("/")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+# >0 switches to multi-process bulk embedding (see EmbeddingPool).
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "0"))
+EMBEDDING_THREADS_PER_WORKER = int(os.getenv("EMBEDDING_THREADS_PER_WORKER", "1"))
 
 
 def find_lecture_dir() -> Path:
@@ -42,8 +50,8 @@ def load_chunks(directory: Path) -> List[Tuple[str, dict]]:
     return chunks
 
 
-def embed(model: SentenceTransformer, texts: Iterable[str]) -> List[list[float]]:
-    return model.encode(list(texts), normalize_embeddings=True).tolist()
+def embed(model: SentenceTransformer, texts: Iterable[str]) -> np.ndarray:
+    return as_vector_matrix(model.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True))
 
 
 def http_request(method: str, endpoint: str, payload: dict | None = None) -> dict:
@@ -65,13 +73,13 @@ def ensure_collection(collection: str, vector_size: int) -> None:
     http_request("PUT", endpoint, payload)
 
 
-def upsert(collection: str, vectors: List[list[float]], payloads: List[dict]) -> None:
-    if not vectors:
+def upsert(collection: str, vectors: np.ndarray, payloads: List[dict]) -> None:
+    if not len(vectors):
         return
     ids = [idx for idx, _ in enumerate(vectors)]
     endpoint = f"{QDRANT_URL}/collections/{collection}/points?wait=true"
     # Use batch format for maximum compatibility with older servers
-    body = {"batch": {"ids": ids, "vectors": vectors, "payloads": payloads}}
+    body = {"batch": {"ids": ids, "vectors": vectors.tolist(), "payloads": payloads}}
     http_request("PUT", endpoint, body)
 
 
@@ -83,10 +91,17 @@ def main() -> None:
         return
 
     texts, payloads = zip(*chunks)
-    model = SentenceTransformer(DEFAULT_MODEL)
-    vectors = embed(model, texts)
-
-    ensure_collection(DEFAULT_COLLECTION, vector_size=len(vectors[0]))
+    if EMBEDDING_WORKERS > 0:
+        with EmbeddingPool(
+            DEFAULT_MODEL, workers=EMBEDDING_WORKERS, threads_per_worker=EMBEDDING_THREADS_PER_WORKER
+        ) as pool:
+            vectors = pool.encode(list(texts))
+    else:
+        # Bulk loads run in their own process; keep them off a shared embedding server.
+        model = get_embedding_model(DEFAULT_MODEL, server=None).model
+        vectors = embed(model, texts)
+
+    ensure_collection(DEFAULT_COLLECTION, vector_size=vectors.shape[1])
     upsert(DEFAULT_COLLECTION, vectors, list(payloads))
     print(f"Inserted {len(vectors)} chunks into collection '{DEFAULT_COLLECTION}' from {lecture_dir}.")
 
@@ -1,17 +1,34 @@
 """Helpers to chunk text, embed, store, and search in Qdrant."""
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+from dataclasses import dataclass
 from pathlib import Path
+from itertools import islice
 from typing import Iterable, Iterator, List, Tuple
 
 import httpx
+import numpy as np
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
 from qdrant_client.http.exceptions import UnexpectedResponse
 
-from ragcoach.embeddings.model import EmbeddingModel
+from ragcoach.embeddings.model import EmbeddingModel, as_vector_matrix
+from ragcoach.embeddings.projection import CompactProjection
+from ragcoach.embeddings.registry import get_embedding_model
+
+from .chunk_store import DEFAULT_CHUNK_STORE, DEFAULT_CHUNK_STORE_PATH, ChunkStore, ChunkTextMissingError
+from .dedup import DEFAULT_DEDUP_INDEX, ChunkDeduplicator
+from .reader_pdf import PLACEHOLDER_TEXT, iter_jsonl_pages
+from .search_cache import (
+    CollectionVersions,
+    SearchCache,
+    default_search_cache,
+    get_collection_versions,
+    normalize_question,
+)
 
 
 # Align default with EmbeddingModel default (dim=768) to avoid size mismatch by default.
@@ -19,6 +36,45 @@ DEFAULT_MODEL = os.getenv("EMBEDDING_MODEL", "intfloat/e5-base")
 DEFAULT_COLLECTION = os.getenv("QDRANT_COLLECTION", "lectures")
 DEFAULT_QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
 DEFAULT_QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+# How many chunks are embedded and upserted together while streaming pages in.
+DEFAULT_INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+# Two-stage search: 0 disables the compact prefilter vector.
+DEFAULT_COMPACT_DIM = int(os.getenv("QDRANT_COMPACT_DIM", "0"))
+DEFAULT_COMPACT_PROJECTION = os.getenv("QDRANT_COMPACT_PROJECTION")
+DEFAULT_RESCORE_OVERSAMPLE = int(os.getenv("QDRANT_RESCORE_OVERSAMPLE", "4"))
+DEFAULT_DEDUP = os.getenv("DEDUP_ENABLED", "1").lower() not in ("0", "false", "no")
+
+# Vector names used by collections created with a compact prefilter vector.
+FULL_VECTOR = "full"
+COMPACT_VECTOR = "compact"
+
+SNAPSHOT_MANIFEST = "manifest.json"
+SNAPSHOT_PAYLOADS = "payloads.jsonl"
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def vectors_dtype(embedder) -> np.dtype:
+    """Dtype the embedder produces (``EMBEDDING_DTYPE`` for ours, float32 for duck-typed ones)."""
+    return np.dtype(getattr(embedder, "dtype", np.float32))
+
+
+def _dump_model(value) -> dict:
+    """JSON-ready dict of a qdrant-client model under pydantic v1 or v2."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    return json.loads(value.json(exclude_none=True))
+
+
+@dataclass
+class IngestReport:
+    inserted: int = 0
+    skipped_pages: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+
+    @property
+    def dropped(self) -> int:
+        return self.exact_duplicates + self.near_duplicates
 
 
 class QdrantService:
@@ -29,33 +85,73 @@ class QdrantService:
         collection: str | None = None,
         embedding_model: str = DEFAULT_MODEL,
         chunk_words: int = 150,
+        chunk_overlap: int = 0,
         qdrant_url: str | None = DEFAULT_QDRANT_URL,
         qdrant_api_key: str | None = DEFAULT_QDRANT_API_KEY,
+        ingest_batch_size: int = DEFAULT_INGEST_BATCH_SIZE,
+        compact_dim: int = DEFAULT_COMPACT_DIM,
+        compact_projection: str | Path | None = DEFAULT_COMPACT_PROJECTION,
+        rescore_oversample: int = DEFAULT_RESCORE_OVERSAMPLE,
+        embedder: EmbeddingModel | None = None,
+        dedup: bool = DEFAULT_DEDUP,
+        dedup_index: str | Path = DEFAULT_DEDUP_INDEX,
+        search_cache: SearchCache | None = default_search_cache,
+        chunk_store: bool = DEFAULT_CHUNK_STORE,
+        chunk_store_path: str | Path = DEFAULT_CHUNK_STORE_PATH,
+        collection_versions: CollectionVersions | None = None,
     ) -> None:
         self.collection = (collection or DEFAULT_COLLECTION or "lectures").strip()
         if not self.collection:
             raise ValueError("Qdrant collection name is empty. Set QDRANT_COLLECTION or pass collection=...")
 
+        self.embedding_model = embedding_model or DEFAULT_MODEL
         self.chunk_words = chunk_words
-        self.embedder = EmbeddingModel(embedding_model)
+        self.chunk_overlap = chunk_overlap
+        self.ingest_batch_size = max(1, ingest_batch_size)
+        # Any object with ``encode(texts)`` and ``dim`` works, e.g. an ``EmbeddingPool``.
+        # Otherwise services share one loaded model per name through the registry.
+        self.embedder = embedder or get_embedding_model(self.embedding_model)
+        self.compact_dim = max(0, compact_dim)
+        self.compact_projection_path = compact_projection
+        self.rescore_oversample = max(1, rescore_oversample)
+        self._projection: CompactProjection | None = None
+        self.dedup = dedup
+        self.dedup_index_path = dedup_index
+        self._deduplicator: ChunkDeduplicator | None = None
+        self.search_cache = search_cache
+        # Shared with other processes so their cached results see our writes (default: data dir).
+        self._collection_versions = collection_versions
+        # Texts live in a local ChunkStore; Qdrant payloads keep only source/page/chunk_id.
+        self.chunk_store = chunk_store
+        self.chunk_store_path = chunk_store_path
+        self._chunk_store: ChunkStore | None = None
         self.qdrant_url = self._normalize_url(qdrant_url or "http://localhost:6333")
         self.api_key = qdrant_api_key
-        self.client = QdrantClient(
-            url=self.qdrant_url,
-            api_key=qdrant_api_key,
-            timeout=60,
-            prefer_grpc=False,
-            check_compatibility=False,
-        )
+        if self.qdrant_url == ":memory:":
+            # In-process local mode (qdrant-client), used by the load-test harness and experiments.
+            self.client = QdrantClient(location=":memory:")
+        else:
+            self.client = QdrantClient(
+                url=self.qdrant_url,
+                api_key=qdrant_api_key,
+                timeout=60,
+                prefer_grpc=False,
+                check_compatibility=False,
+            )
 
     @staticmethod
-    def chunk_text(text: str, max_words: int) -> list[str]:
+    def chunk_text(text: str, max_words: int, overlap: int = 0) -> list[str]:
+        """Windows of ``max_words`` words; consecutive chunks share ``overlap`` words."""
+        if not 0 <= overlap < max_words:
+            raise ValueError(f"Chunk overlap must be in 0..{max_words - 1}, got {overlap}")
         words = text.split()
-        return [
-            " ".join(words[i : i + max_words])
-            for i in range(0, len(words), max_words)
-            if words[i : i + max_words]
-        ]
+        step = max_words - overlap
+        chunks = []
+        for i in range(0, len(words), step):
+            chunks.append(" ".join(words[i : i + max_words]))
+            if i + max_words >= len(words):
+                break
+        return chunks
 
     @staticmethod
     def _normalize_url(url: str) -> str:
@@ -73,6 +169,15 @@ class QdrantService:
             raise ValueError("JSON content must be an object mapping page keys to text")
         return data
 
+    @classmethod
+    def load_pages(cls, path: str | Path) -> Iterator[Tuple[str, str]]:
+        """Stream ``.jsonl`` page files line by line; fall back to the whole-document JSON format."""
+        path = Path(path)
+        if path.suffix.lower() == ".jsonl":
+            yield from iter_jsonl_pages(path)
+            return
+        yield from cls._load_json(path).items()
+
     @staticmethod
     def load_question_from_file(path: str | Path = "data/questions.txt") -> str:
         file_path = Path(path)
@@ -83,13 +188,25 @@ class QdrantService:
                 return line.strip()
         raise ValueError("No question lines found in questions file")
 
-    def _iter_chunks(self, data: dict[str, str], source: str, max_words: int | None = None) -> Iterator[Tuple[str, dict]]:
+    def _iter_chunks(
+        self,
+        pages: Iterable[Tuple[str, str]] | dict[str, str],
+        source: str,
+        max_words: int | None = None,
+        report: IngestReport | None = None,
+        overlap: int | None = None,
+    ) -> Iterator[Tuple[str, dict]]:
         max_words = max_words or self.chunk_words
-        for page_key, text in data.items():
+        overlap = self.chunk_overlap if overlap is None else overlap
+        if isinstance(pages, dict):
+            pages = pages.items()
+        for page_key, text in pages:
             cleaned = (text or "").strip()
-            if not cleaned:
+            if not cleaned or cleaned == PLACEHOLDER_TEXT:
+                if report is not None:
+                    report.skipped_pages += 1
                 continue
-            for idx, chunk in enumerate(self.chunk_text(cleaned, max_words)):
+            for idx, chunk in enumerate(self.chunk_text(cleaned, max_words, overlap)):
                 payload = {
                     "source": source,
                     "page": page_key,
@@ -100,22 +217,18 @@ class QdrantService:
 
     def _ensure_collection(self, vector_size: int) -> None:
         if not self._collection_exists():
-            self.client.create_collection(
-                collection_name=self.collection,
-                vectors_config=models.VectorParams(size=vector_size, distance=models.Distance.COSINE),
-            )
+            if self.compact_dim:
+                vectors_config = {
+                    FULL_VECTOR: models.VectorParams(size=vector_size, distance=models.Distance.COSINE),
+                    COMPACT_VECTOR: models.VectorParams(size=self.compact_dim, distance=models.Distance.COSINE),
+                }
+            else:
+                vectors_config = models.VectorParams(size=vector_size, distance=models.Distance.COSINE)
+            self.client.create_collection(collection_name=self.collection, vectors_config=vectors_config)
             return
 
         info = self.client.get_collection(self.collection)
-        vectors_config = info.config.params.vectors
-
-        if isinstance(vectors_config, models.VectorParams):
-            existing_size = vectors_config.size
-        elif isinstance(vectors_config, dict):
-            first_vector = next(iter(vectors_config.values()), None)
-            existing_size = first_vector.size if isinstance(first_vector, models.VectorParams) else None
-        else:
-            existing_size = None
+        existing_size = self._full_vector_size(info.config.params.vectors)
 
         if existing_size and existing_size != vector_size:
             raise ValueError(
@@ -124,49 +237,206 @@ class QdrantService:
                 "Either change QDRANT_COLLECTION or recreate the collection."
             )
 
+    @staticmethod
+    def _full_vector_size(vectors_config) -> int | None:
+        if isinstance(vectors_config, models.VectorParams):
+            return vectors_config.size
+        if isinstance(vectors_config, dict):
+            full_vector = vectors_config.get(FULL_VECTOR) or next(iter(vectors_config.values()), None)
+            return full_vector.size if isinstance(full_vector, models.VectorParams) else None
+        return None
+
+    def _get_vectors_config(self):
+        try:
+            info = self.client.get_collection(self.collection)
+        except (UnexpectedResponse, ValueError):
+            return None
+        return info.config.params.vectors
+
+    @staticmethod
+    def _has_compact_vector(vectors_config) -> bool:
+        return isinstance(vectors_config, dict) and COMPACT_VECTOR in vectors_config
+
+    def _get_projection(self, dim_in: int, vectors_config) -> CompactProjection:
+        """PCA basis from ``compact_projection`` if given, otherwise a seeded random projection.
+
+        The output size is the collection's ``compact`` vector size, not ``compact_dim``,
+        so an existing collection keeps working whatever ``QDRANT_COMPACT_DIM`` says.
+        """
+        dim_out = vectors_config[COMPACT_VECTOR].size
+        cached = self._projection
+        if cached is None or cached.dim_in != dim_in or cached.dim_out != dim_out:
+            if self.compact_projection_path:
+                projection = CompactProjection.load(self.compact_projection_path)
+            else:
+                projection = CompactProjection.random(dim_in, dim_out)
+            if projection.dim_in != dim_in:
+                raise ValueError(
+                    f"Compact projection expects vectors of size {projection.dim_in}, "
+                    f"but embedding model produced {dim_in}."
+                )
+            if projection.dim_out != dim_out:
+                raise ValueError(
+                    f"Compact projection {self.compact_projection_path} produces vectors of size "
+                    f"{projection.dim_out}, but collection '{self.collection}' stores compact vectors of size "
+                    f"{dim_out}. Refit the projection with that size or recreate the collection."
+                )
+            self._projection = projection
+        return self._projection
+
+    def _batch_vectors(self, vectors: np.ndarray, vectors_config, projection: CompactProjection | None):
+        """Vectors for a batch upsert: the matrix itself, or ``{name: matrix}`` for named vectors."""
+        if not isinstance(vectors_config, dict):
+            return vectors
+        named = {FULL_VECTOR: vectors}
+        if projection is not None:
+            named[COMPACT_VECTOR] = projection.transform(vectors)
+        return named
+
+    @property
+    def collection_versions(self) -> CollectionVersions:
+        if self._collection_versions is None:
+            self._collection_versions = get_collection_versions()
+        return self._collection_versions
+
+    def _bump_version(self) -> None:
+        self.collection_versions.bump(self.qdrant_url, self.collection)
+
+    def _get_chunk_store(self) -> ChunkStore:
+        if self._chunk_store is None:
+            self._chunk_store = ChunkStore(self.chunk_store_path)
+        return self._chunk_store
+
+    def _get_deduplicator(self) -> ChunkDeduplicator:
+        if self._deduplicator is None:
+            self._deduplicator = ChunkDeduplicator(self.dedup_index_path)
+        return self._deduplicator
+
     def ingest_json(self, json_path: str | Path, source_name: str | None = None, chunk_words: int | None = None) -> int:
         path = Path(json_path)
-        data = self._load_json(path)
-        source = source_name or path.stem
+        report = self.ingest_pages(self.load_pages(path), source=source_name or path.stem, chunk_words=chunk_words)
+        return report.inserted
 
+    def ingest_pages(
+        self,
+        pages: Iterable[Tuple[str, str]],
+        source: str,
+        chunk_words: int | None = None,
+        chunk_overlap: int | None = None,
+    ) -> IngestReport:
+        """Chunk, embed and upsert pages in fixed-size batches as they are produced.
+
+        ``pages`` may be a live generator (e.g. ``iter_pdf_pages``): extraction and
+        embedding take turns batch by batch (nothing runs concurrently), so peak
+        memory depends on the batch size only, not on the document size.
+        Placeholder/empty pages are skipped and, with ``dedup`` on, exact and near
+        duplicate chunks (within and across sources) are dropped before embedding.
+        """
         max_words = chunk_words or self.chunk_words
-        prepared = list(self._iter_chunks(data, source, max_words))
-        if not prepared:
-            return 0
-
-        texts, payloads = zip(*prepared)
-        vectors = self.embedder.encode(list(texts))
+        report = IngestReport()
+        chunks = self._iter_chunks(pages, source, max_words, report, overlap=chunk_overlap)
 
-        self._ensure_collection(vector_size=len(vectors[0]))
-
-        points = []
-        for vector, payload in zip(vectors, payloads):
-            pid = self._make_numeric_id(payload)
-            points.append(models.PointStruct(id=pid, vector=vector, payload=payload))
-        self._upsert_points(points)
-        return len(points)
+        deduplicator = self._get_deduplicator() if self.dedup else None
+        store = self._get_chunk_store() if self.chunk_store else None
+        if not self._collection_exists():
+            # Signatures of a dropped/recreated collection would wrongly reject everything.
+            if deduplicator is not None:
+                deduplicator.forget_collection(self.qdrant_url, self.collection)
+            if store is not None:
+                store.forget_collection(self.qdrant_url, self.collection)
+
+        collection_ready = False
+        vectors_config = None
+        projection = None
+        while True:
+            batch = list(islice(chunks, self.ingest_batch_size))
+            if not batch:
+                break
+
+            if deduplicator is not None:
+                verdicts = deduplicator.classify(self.qdrant_url, self.collection, [text for text, _ in batch])
+                report.exact_duplicates += verdicts.count("exact")
+                report.near_duplicates += verdicts.count("near")
+                batch = [item for item, verdict in zip(batch, verdicts) if verdict is None]
+                if not batch:
+                    continue
+
+            texts, payloads = zip(*batch)
+            vectors = as_vector_matrix(self.embedder.encode(list(texts)), vectors_dtype(self.embedder))
+
+            if not collection_ready:
+                self._ensure_collection(vector_size=vectors.shape[1])
+                vectors_config = self._get_vectors_config()
+                if self._has_compact_vector(vectors_config):
+                    projection = self._get_projection(vectors.shape[1], vectors_config)
+                collection_ready = True
+
+            ids = [self._make_numeric_id(payload) for payload in payloads]
+            if store is not None:
+                # Texts first: a point visible in Qdrant must always be hydratable.
+                store.put_many(self.qdrant_url, self.collection, ids, texts)
+                payloads = [{key: value for key, value in payload.items() if key != "text"} for payload in payloads]
+            self._upsert_batch(ids, self._batch_vectors(vectors, vectors_config, projection), list(payloads))
+            if deduplicator is not None:
+                deduplicator.remember(self.qdrant_url, self.collection, list(texts))
+            report.inserted += len(ids)
+        # Results cached while this ingest was in flight saw a partial collection.
+        self._bump_version()
+        return report
+
+    def search(
+        self,
+        question: str,
+        top_k: int = 5,
+        sources: list[str] | None = None,
+        include_text: bool = True,
+    ) -> List[dict]:
+        """Top-k chunks for ``question``, optionally restricted to payload ``source`` values.
+
+        With ``include_text=False`` hits carry metadata only (id, score, source, page, chunk_id).
+        """
+        question = normalize_question(question)
+        cache_key = self._search_cache_key(question, top_k, sources) if self.search_cache is not None else None
+        if cache_key is not None:
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                return self._finish_hits(cached, include_text)
 
-    def search(self, question: str, top_k: int = 5) -> List[dict]:
         if not self._collection_exists():
             raise ValueError(f"Collection '{self.collection}' not found. Ingest data first.")
 
-        vector = self.embedder.encode([question])[0]
-        collection_vector_size = self._get_collection_vector_size()
-        if collection_vector_size and len(vector) != collection_vector_size:
+        query_filter = None
+        if sources:
+            query_filter = models.Filter(
+                must=[models.FieldCondition(key="source", match=models.MatchAny(any=list(sources)))]
+            )
+
+        vector = as_vector_matrix(self.embedder.encode([question]), np.float32)[0]
+        vectors_config = self._get_vectors_config()
+        collection_vector_size = self._full_vector_size(vectors_config)
+        if collection_vector_size and vector.shape[0] != collection_vector_size:
             raise ValueError(
                 f"Vector size mismatch: collection expects {collection_vector_size}, "
-                f"but embedding model produced {len(vector)}. "
+                f"but embedding model produced {vector.shape[0]}. "
                 "Use the same EMBEDDING_MODEL as used for ingestion or recreate the collection."
             )
+        # Legacy collections still hold texts in payloads; never ship them, hydrate the top-k instead.
+        with_payload = models.PayloadSelectorExclude(exclude=["text"]) if self.chunk_store else True
         try:
-            result = self._run_search(vector, top_k)
+            if self.compact_dim and self._has_compact_vector(vectors_config):
+                result = self._two_stage_search(vector, top_k, vectors_config, query_filter, with_payload=with_payload)
+            else:
+                using = FULL_VECTOR if isinstance(vectors_config, dict) else None
+                result = self._run_search(
+                    vector, top_k, using=using, query_filter=query_filter, with_payload=with_payload
+                )
         except UnexpectedResponse as exc:
             raise RuntimeError(
                 f"Qdrant search failed for collection '{self.collection}' "
                 f"at '{self.qdrant_url}'. Check QDRANT_URL, API key, and collection name."
             ) from exc
 
-        points = result if isinstance(result, list) else getattr(result, "result", []) or []
+        points = self._as_points(result)
 
         normalized = []
         for point in points:
@@ -180,7 +450,62 @@ class QdrantService:
                 payload = getattr(point, "payload", None) or {}
             normalized.append({"id": pid, "score": score, "payload": payload})
 
-        return normalized
+        if cache_key is not None:
+            self.search_cache.put(cache_key, normalized)
+        return self._finish_hits(normalized, include_text)
+
+    def _finish_hits(self, hits: List[dict], include_text: bool) -> List[dict]:
+        if include_text:
+            self._hydrate_texts(hits)
+        else:
+            for hit in hits:
+                hit["payload"].pop("text", None)
+        return hits
+
+    def _hydrate_texts(self, hits: List[dict]) -> None:
+        """Fill ``payload["text"]`` from the chunk store, falling back to Qdrant for legacy points.
+
+        Raises ``ChunkTextMissingError`` when a point has its text in neither place (e.g. the
+        API runs against a different chunk store than the ingest), rather than hand an empty
+        context to the LLM.
+        """
+        missing = [hit for hit in hits if "text" not in hit["payload"]]
+        if not missing:
+            return
+        texts: dict = {}
+        if self.chunk_store:
+            texts = self._get_chunk_store().get_many(self.qdrant_url, self.collection, [hit["id"] for hit in missing])
+        legacy_ids = [hit["id"] for hit in missing if hit["id"] not in texts]
+        if legacy_ids:
+            for point in self.client.retrieve(
+                collection_name=self.collection, ids=legacy_ids, with_payload=["text"], with_vectors=False
+            ):
+                if "text" in (point.payload or {}):
+                    texts[point.id] = point.payload["text"]
+        lost = [hit["id"] for hit in missing if hit["id"] not in texts]
+        if lost:
+            raise ChunkTextMissingError(
+                f"Texts of {len(lost)} of {len(missing)} hits in collection '{self.collection}' are missing "
+                f"(e.g. point {lost[0]}); they are neither in Qdrant payloads nor in the chunk store "
+                f"{self.chunk_store_path if self.chunk_store else '(disabled)'}. Point CHUNK_STORE_PATH or "
+                "RAGCOACH_DATA_DIR at the store used for ingestion, or re-ingest the collection."
+            )
+        for hit in missing:
+            hit["payload"]["text"] = texts[hit["id"]]
+
+    def _search_cache_key(self, question: str, top_k: int, sources: list[str] | None) -> tuple:
+        # Any ingest/upsert/clear (in any process) bumps the collection version,
+        # so entries cached before a write are unreachable.
+        return (
+            self.qdrant_url,
+            self.collection,
+            self.collection_versions.get(self.qdrant_url, self.collection),
+            self.embedding_model,
+            question,
+            top_k,
+            tuple(sorted(sources)) if sources else None,
+            self.compact_dim if self.compact_dim else None,
+        )
 
     def search_from_file(self, path: str | Path = "data/questions.txt", top_k: int = 5) -> List[dict]:
         question = self.load_question_from_file(path)
@@ -195,47 +520,136 @@ class QdrantService:
             if "404" in str(exc) or "Not Found" in str(exc):
                 return False
             raise
+        except ValueError:
+            # Local (":memory:") mode reports a missing collection as ValueError.
+            return False
+
+    def point_count(self) -> int:
+        """Points in the collection; 0 when it does not exist."""
+        if not self._collection_exists():
+            return 0
+        return self.client.count(collection_name=self.collection, exact=True).count
+
+    def _two_stage_search(
+        self,
+        vector: np.ndarray,
+        top_k: int,
+        vectors_config,
+        query_filter: models.Filter | None = None,
+        with_payload: bool | models.PayloadSelector = True,
+    ):
+        """Prefilter on the compact vector, then rescore the candidates exactly with the full one."""
+        compact = self._get_projection(vector.shape[0], vectors_config).transform(vector)
+        candidates = self._run_search(
+            compact,
+            top_k * self.rescore_oversample,
+            using=COMPACT_VECTOR,
+            query_filter=query_filter,
+            with_payload=False,
+        )
+        candidate_ids = [self._point_id(point) for point in self._as_points(candidates)]
+        if not candidate_ids:
+            return []
+        # Candidates already satisfy query_filter, so the id restriction alone is enough.
+        id_filter = models.Filter(must=[models.HasIdCondition(has_id=candidate_ids)])
+        return self._run_search(
+            vector, top_k, using=FULL_VECTOR, query_filter=id_filter, with_payload=with_payload, exact=True
+        )
+
+    @staticmethod
+    def _as_points(result) -> list:
+        return result if isinstance(result, list) else getattr(result, "result", []) or []
 
-    def _run_search(self, vector: list[float], top_k: int):
+    @staticmethod
+    def _point_id(point):
+        return point.get("id") if isinstance(point, dict) else getattr(point, "id", None)
+
+    def _run_search(
+        self,
+        vector: np.ndarray,
+        top_k: int,
+        using: str | None = None,
+        query_filter: models.Filter | None = None,
+        with_payload: bool | models.PayloadSelector = True,
+        exact: bool = False,
+    ):
         """Compatibility wrapper for different qdrant-client versions."""
+        # The single conversion of the query vector, right where it is serialised.
+        vector = np.asarray(vector, dtype=np.float32).tolist()
+        search_params = models.SearchParams(exact=True) if exact else None
         kwargs = {
             "collection_name": self.collection,
-            "query_vector": vector,
+            "query_vector": (using, vector) if using else vector,
+            "query_filter": query_filter,
+            "search_params": search_params,
             "limit": top_k,
-            "with_payload": True,
+            "with_payload": with_payload,
         }
         if hasattr(self.client, "search"):
             return self.client.search(**kwargs)
         if hasattr(self.client, "search_points"):
             return self.client.search_points(**kwargs)
+        if hasattr(self.client, "query_points"):
+            # qdrant-client >= 1.13 only has the Query API (server >= 1.10, and local ":memory:" mode).
+            try:
+                response = self.client.query_points(
+                    collection_name=self.collection,
+                    query=vector,
+                    using=using,
+                    query_filter=query_filter,
+                    search_params=search_params,
+                    limit=top_k,
+                    with_payload=with_payload,
+                )
+                return response.points
+            except UnexpectedResponse as exc:
+                if exc.status_code != 404 or not self._collection_exists():
+                    raise
+                # Older servers (e.g. the 1.7 image in docker-compose) have no /points/query.
 
         # Fallbacks to HTTP API (different client versions expose different methods)
+        body = self._search_body(vector, top_k, using, query_filter, with_payload, exact)
         http_points = getattr(self.client, "http", None)
-        if http_points and hasattr(http_points, "points_api"):
+        if http_points and hasattr(http_points, "points_api") and hasattr(models, "SearchRequest"):
             api = http_points.points_api
+            search_request = models.SearchRequest(**body)
             if hasattr(api, "search_points"):
-                response = api.search_points(
-                    collection_name=self.collection,
-                    search_request=models.SearchRequest(vector=vector, limit=top_k, with_payload=True),
-                )
+                response = api.search_points(collection_name=self.collection, search_request=search_request)
                 return response.result if hasattr(response, "result") else response
             if hasattr(api, "search"):
-                return api.search(
-                    collection_name=self.collection,
-                    search_request=models.SearchRequest(vector=vector, limit=top_k, with_payload=True),
-                )
+                return api.search(collection_name=self.collection, search_request=search_request)
 
         # Raw HTTP as last resort
-        return self._raw_http_search(vector=vector, top_k=top_k)
+        return self._raw_http_search(body)
+
+    @staticmethod
+    def _search_body(
+        vector: list[float],
+        top_k: int,
+        using: str | None,
+        query_filter: models.Filter | None,
+        with_payload: bool | models.PayloadSelector,
+        exact: bool,
+    ) -> dict:
+        """REST ``/points/search`` request body; built by hand because newer clients dropped ``SearchRequest``."""
+        body = {
+            "vector": {"name": using, "vector": vector} if using else vector,
+            "limit": top_k,
+            "with_payload": with_payload if isinstance(with_payload, bool) else _dump_model(with_payload),
+        }
+        if query_filter is not None:
+            body["filter"] = _dump_model(query_filter)
+        if exact:
+            body["params"] = {"exact": True}
+        return body
 
-    def _raw_http_search(self, vector: list[float], top_k: int):
+    def _raw_http_search(self, body: dict):
         headers = {"Content-Type": "application/json"}
         if self.api_key:
             headers["api-key"] = self.api_key
         url = f"{self.qdrant_url}/collections/{self.collection}/points/search"
-        payload = {"vector": vector, "limit": top_k, "with_payload": True}
         try:
-            resp = httpx.post(url, headers=headers, json=payload, timeout=60)
+            resp = httpx.post(url, headers=headers, json=body, timeout=60)
             resp.raise_for_status()
         except httpx.HTTPStatusError as exc:
             raise RuntimeError(
@@ -244,8 +658,207 @@ class QdrantService:
         data = resp.json()
         return data.get("result", [])
 
+    def scroll_points(self, batch_size: int = 1024, with_vectors: bool = True) -> Iterator:
+        """Iterate over every point of the collection in pages of ``batch_size``."""
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=with_vectors,
+            )
+            yield from points
+            if offset is None:
+                break
+
+    def storage_stats(self) -> dict:
+        """Point count and approximate bytes held by Qdrant (float32 vectors, payload JSON) and the chunk store."""
+        count = self.point_count()
+        if not count:
+            return {"vectors": 0, "vector_bytes": 0, "payload_bytes": 0, "text_bytes": 0}
+        vectors_config = self._get_vectors_config()
+        params = vectors_config.values() if isinstance(vectors_config, dict) else [vectors_config]
+        payload_bytes = sum(
+            len(json.dumps(point.payload or {}, ensure_ascii=False).encode("utf-8"))
+            for point in self.scroll_points(with_vectors=False)
+        )
+        return {
+            "vectors": count,
+            "vector_bytes": count * sum(vector_params.size for vector_params in params) * 4,
+            "payload_bytes": payload_bytes,
+            "text_bytes": (
+                self._get_chunk_store().text_bytes(self.qdrant_url, self.collection) if self.chunk_store else 0
+            ),
+        }
+
+    def export_snapshot(self, directory: str | Path, batch_size: int = 1024) -> dict:
+        """Dump the collection to ``directory``: one float32 ``.npy`` per vector plus JSONL payloads.
+
+        The ``.npy`` files are contiguous and can be opened with ``np.load(..., mmap_mode="r")``.
+        """
+        if not self._collection_exists():
+            raise ValueError(f"Collection '{self.collection}' not found. Nothing to export.")
+
+        out_dir = Path(directory)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        info = self.client.get_collection(self.collection)
+        vectors_config = info.config.params.vectors
+        named = isinstance(vectors_config, dict)
+        params = vectors_config if named else {"": vectors_config}
+        count = self.client.count(collection_name=self.collection, exact=True).count
+
+        vector_files: dict[str, dict] = {}
+        arrays: dict[str, np.ndarray] = {}
+        for name, vector_params in params.items():
+            filename = f"vectors.{name}.npy" if name else "vectors.npy"
+            vector_files[name] = {
+                "file": filename,
+                "size": vector_params.size,
+                "distance": str(getattr(vector_params.distance, "value", vector_params.distance)),
+            }
+            arrays[name] = np.lib.format.open_memmap(
+                out_dir / filename, mode="w+", dtype=np.float32, shape=(count, vector_params.size)
+            )
+
+        rows = 0
+        points = self.scroll_points(batch_size=batch_size, with_vectors=True)
+        with (out_dir / SNAPSHOT_PAYLOADS).open("w", encoding="utf-8") as payload_file:
+            while page := list(islice(points, batch_size)):
+                if rows + len(page) > count:
+                    raise RuntimeError(f"Collection '{self.collection}' grew during export; retry on a quiet collection.")
+                records = [{"id": point.id, "payload": dict(point.payload or {})} for point in page]
+                # Snapshots stay self-contained: texts from the chunk store go back into the payloads.
+                self._hydrate_texts(records)
+                for point, record in zip(page, records):
+                    for name, array in arrays.items():
+                        array[rows] = point.vector[name] if named else point.vector
+                    payload_file.write(json.dumps(record, ensure_ascii=False))
+                    payload_file.write("\n")
+                    rows += 1
+        for array in arrays.values():
+            array.flush()
+        del arrays
+        if rows != count:
+            # The .npy files were sized for ``count`` rows; trailing zero vectors must not look like data.
+            raise RuntimeError(
+                f"Collection '{self.collection}' shrank during export ({rows} of {count} points); "
+                "retry on a quiet collection."
+            )
+
+        manifest = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "collection": self.collection,
+            "model": self.embedding_model,
+            "count": rows,
+            "named_vectors": named,
+            "vectors": vector_files,
+        }
+        (out_dir / SNAPSHOT_MANIFEST).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        return manifest
+
+    def import_snapshot(
+        self,
+        directory: str | Path,
+        batch_size: int = 1024,
+        parallel: int = 4,
+        recreate: bool = False,
+        check_model: bool = True,
+    ) -> int:
+        """Bulk-load an ``export_snapshot`` dump into a fresh collection without re-embedding."""
+        src_dir = Path(directory)
+        manifest_path = src_dir / SNAPSHOT_MANIFEST
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"Snapshot manifest not found: {manifest_path}")
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format: {manifest.get('format_version')}")
+
+        count = int(manifest["count"])
+        named = bool(manifest.get("named_vectors"))
+        vector_files: dict[str, dict] = manifest["vectors"]
+
+        # The model name pins the vector size, so the embedder is never loaded (no embedding compute at all);
+        # the sizes recorded in the manifest are checked against the .npy files below.
+        if check_model and manifest.get("model") != self.embedding_model:
+            raise ValueError(
+                f"Snapshot was built with '{manifest.get('model')}', "
+                f"but this service uses '{self.embedding_model}'. Pass check_model=False to force."
+            )
+
+        arrays: dict[str, np.ndarray] = {}
+        for name, meta in vector_files.items():
+            array = np.load(src_dir / meta["file"], mmap_mode="r")
+            if array.shape != (count, meta["size"]):
+                raise ValueError(
+                    f"{meta['file']} has shape {array.shape}, manifest expects ({count}, {meta['size']})"
+                )
+            arrays[name] = array
+
+        if self._collection_exists():
+            if not recreate:
+                raise ValueError(
+                    f"Collection '{self.collection}' already exists. Import into a fresh collection or pass recreate=True."
+                )
+            self.clear_collection()
+
+        vectors_params = {
+            name: models.VectorParams(size=meta["size"], distance=models.Distance(meta["distance"]))
+            for name, meta in vector_files.items()
+        }
+        self.client.create_collection(
+            collection_name=self.collection,
+            vectors_config=vectors_params if named else vectors_params[""],
+        )
+
+        def iter_records():
+            with (src_dir / SNAPSHOT_PAYLOADS).open("r", encoding="utf-8") as payload_file:
+                for line in payload_file:
+                    if line.strip():
+                        yield json.loads(line)
+
+        def iter_payloads():
+            for record in iter_records():
+                payload = record["payload"]
+                if self.chunk_store:
+                    payload = {key: value for key, value in payload.items() if key != "text"}
+                yield payload
+
+        store = self._get_chunk_store() if self.chunk_store else None
+        deduplicator = self._get_deduplicator() if self.dedup else None
+        if deduplicator is not None:
+            # The collection is new: signatures left by an earlier one of that name are stale.
+            deduplicator.forget_collection(self.qdrant_url, self.collection)
+        if store is not None or deduplicator is not None:
+            records = iter_records()
+            while batch := list(islice(records, batch_size)):
+                texts = [record["payload"].get("text", "") for record in batch]
+                if store is not None:
+                    store.put_many(self.qdrant_url, self.collection, [record["id"] for record in batch], texts)
+                if deduplicator is not None:
+                    # Re-ingesting the source PDFs later must find the imported chunks as duplicates.
+                    deduplicator.remember(self.qdrant_url, self.collection, [text for text in texts if text])
+
+        self.client.upload_collection(
+            collection_name=self.collection,
+            vectors=arrays if named else arrays[""],
+            payload=iter_payloads(),
+            ids=(record["id"] for record in iter_records()),
+            batch_size=batch_size,
+            parallel=max(1, parallel),
+            wait=True,
+        )
+        self._bump_version()
+        return count
+
     def clear_collection(self) -> None:
         """Drop the collection if it exists; ignore if missing."""
+        if self.dedup:
+            self._get_deduplicator().forget_collection(self.qdrant_url, self.collection)
+        if self.chunk_store:
+            self._get_chunk_store().forget_collection(self.qdrant_url, self.collection)
+        self._bump_version()
         try:
             self.client.delete_collection(self.collection)
             return
@@ -263,29 +876,28 @@ class QdrantService:
         if resp.status_code not in (200, 202, 404):
             raise RuntimeError(f"Failed to delete collection: {resp.status_code} {resp.text}")
 
-    def _get_collection_vector_size(self) -> int | None:
-        try:
-            info = self.client.get_collection(self.collection)
-        except UnexpectedResponse:
-            return None
-
-        vectors_config = info.config.params.vectors
-        if isinstance(vectors_config, models.VectorParams):
-            return vectors_config.size
-        if isinstance(vectors_config, dict):
-            first_vector = next(iter(vectors_config.values()), None)
-            return first_vector.size if isinstance(first_vector, models.VectorParams) else None
-        return None
-
     @staticmethod
     def _make_numeric_id(payload: dict) -> int:
-        """Qdrant 1.7 does not accept arbitrary strings; use a stable numeric id."""
+        """Qdrant 1.7 does not accept arbitrary strings; use a stable numeric id.
+
+        Derived from a digest, not ``hash()``, which is salted per process.
+        """
         key = f"{payload.get('source','')}-{payload.get('page','')}-{payload.get('chunk_id','')}"
-        return abs(hash(key)) % (2**63)
+        return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big") % (2**63)
 
-    def _upsert_points(self, points: list[models.PointStruct]) -> None:
+    def _upsert_batch(self, ids: list[int], vectors: np.ndarray | dict[str, np.ndarray], payloads: list[dict]) -> None:
+        """Upsert one ingest batch column-wise, without building a ``PointStruct`` per chunk."""
         try:
-            self.client.upsert(collection_name=self.collection, points=points, wait=True)
+            self.client.upload_collection(
+                collection_name=self.collection,
+                vectors=vectors,
+                payload=payloads,
+                ids=ids,
+                batch_size=len(ids),
+                parallel=1,
+                wait=True,
+            )
+            self._bump_version()
             return
         except UnexpectedResponse:
             pass  # fall back to HTTP
@@ -294,16 +906,12 @@ class QdrantService:
         if self.api_key:
             headers["api-key"] = self.api_key
         url = f"{self.qdrant_url}/collections/{self.collection}/points?wait=true"
-        body = {
-            "points": [
-                {
-                    "id": p.id,
-                    "vector": p.vector,
-                    "payload": p.payload,
-                }
-                for p in points
-            ]
-        }
+        if isinstance(vectors, dict):
+            batch_vectors = {name: matrix.tolist() for name, matrix in vectors.items()}
+        else:
+            batch_vectors = vectors.tolist()
+        # Batch (column) format: one list of ids, one matrix, one list of payloads.
+        body = {"batch": {"ids": ids, "vectors": batch_vectors, "payloads": payloads}}
         resp = httpx.put(url, headers=headers, json=body, timeout=60)
         try:
             resp.raise_for_status()
@@ -311,3 +919,4 @@ class QdrantService:
             raise RuntimeError(
                 f"Qdrant HTTP upsert failed {exc.response.status_code}: {exc.response.text}"
             ) from exc
+        self._bump_version()
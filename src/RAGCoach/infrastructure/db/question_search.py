@@ -3,16 +3,11 @@ from __future__ import annotations
 
 import argparse
 
+from ..profiling import get_profile_store
 from .qdrant_service import QdrantService
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Search relevant lecture chunks for a question")
-    parser.add_argument("question", nargs="?", help="Question text. If omitted, uses first line from data/questions.txt")
-    parser.add_argument("--top_k", type=int, default=5, help="Number of results to return")
-    parser.add_argument("--questions_file", default="data/questions.txt", help="Path to questions file")
-    args = parser.parse_args()
-
+def run(args: argparse.Namespace) -> None:
     service = QdrantService()
     question = args.question or service.load_question_from_file(args.questions_file)
     hits = service.search(question, top_k=args.top_k)
@@ -28,5 +23,20 @@ def main() -> None:
         print("-" * 40)
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Search relevant lecture chunks for a question")
+    parser.add_argument("question", nargs="?", help="Question text. If omitted, uses first line from data/questions.txt")
+    parser.add_argument("--top_k", type=int, default=5, help="Number of results to return")
+    parser.add_argument("--questions_file", default="data/questions.txt", help="Path to questions file")
+    parser.add_argument("--profile", action="store_true", help="Run under cProfile and save the artifact to PROFILE_DIR")
+    args = parser.parse_args()
+
+    if args.profile:
+        _, path = get_profile_store().run("question_search", run, args)
+        print(f"Profile written to {path}")
+    else:
+        run(args)
+
+
 if __name__ == "__main__":
     main()
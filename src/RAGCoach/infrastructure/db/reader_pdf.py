@@ -1,36 +1,192 @@
-import pdfplumber
 import json
+import logging
 import os
+import tempfile
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Iterable, Iterator, Tuple
 
-def pdf_to_json(pdf_file, json_file):
+from .page_cache import DEFAULT_PAGE_CACHE, DEFAULT_PAGE_CACHE_PATH, PageCache, file_sha256
+from .pdf_extractors import get_extractor
+
+PLACEHOLDER_TEXT = "Текст не найден"
+
+logger = logging.getLogger(__name__)
+
+_default_page_cache: PageCache | None = None
+
+
+class PdfExtractionError(RuntimeError):
+    """Raised when a PDF cannot be opened at all; single-page failures go to ``ExtractionReport``."""
+
+
+@dataclass
+class PageError:
+    page: str
+    error: str
+
+
+@dataclass
+class ExtractionReport:
+    """What happened to each page; truthy when the document was opened and output produced."""
+
+    backend: str = ""
+    pages: int = 0
+    cached_pages: int = 0
+    extracted_pages: int = 0
+    errors: list[PageError] = field(default_factory=list)
+    ok: bool = True
+    error: str | None = None
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+
+def get_page_cache() -> PageCache:
+    global _default_page_cache
+    if _default_page_cache is None:
+        _default_page_cache = PageCache(DEFAULT_PAGE_CACHE_PATH)
+    return _default_page_cache
+
+
+def iter_pdf_pages(
+    pdf_file,
+    backend: str | None = None,
+    report: ExtractionReport | None = None,
+    cache: PageCache | None = None,
+    use_cache: bool = DEFAULT_PAGE_CACHE,
+    digest: str | None = None,
+) -> Iterator[Tuple[str, str]]:
+    """Yield ``(page_key, text)`` pairs one page at a time.
+
+    Pages already extracted from the same content (sha256) with the same backend come
+    from the page cache. A page that fails to extract yields ``PLACEHOLDER_TEXT`` and is
+    recorded in ``report.errors``; only a PDF that cannot be opened raises.
+    """
+    extractor = get_extractor(backend)
+    report = report if report is not None else ExtractionReport()
+    report.backend = extractor.name
+    if use_cache and cache is None:
+        cache = get_page_cache()
+    if not use_cache:
+        cache = None
+
+    cached: dict[int, str] = {}
+    page_count = None
+    if cache is not None:
+        digest = digest or file_sha256(pdf_file)
+        page_count = cache.page_count(digest, extractor.name)
+        cached = cache.get_pages(digest, extractor.name)
+
+    if page_count is not None and len(cached) >= page_count:
+        # Every page is cached: the PDF is not even opened.
+        report.pages = page_count
+        for i in range(page_count):
+            report.cached_pages += 1
+            yield f"page_{i+1}", cached[i] if cached[i].strip() else PLACEHOLDER_TEXT
+        return
+
+    try:
+        document = extractor.open(pdf_file)
+    except Exception as exc:
+        report.ok = False
+        report.error = str(exc)
+        raise PdfExtractionError(f"Cannot open PDF {pdf_file} with {extractor.name}: {exc}") from exc
+
+    with document:
+        report.pages = document.page_count
+        if cache is not None:
+            cache.put_document(digest, extractor.name, document.page_count)
+        for i in range(document.page_count):
+            page_key = f"page_{i+1}"
+            if i in cached:
+                report.cached_pages += 1
+                text = cached[i]
+            else:
+                try:
+                    text = document.extract_text(i)
+                except Exception as exc:
+                    logger.warning("Cannot extract %s of %s with %s: %s", page_key, pdf_file, extractor.name, exc)
+                    report.errors.append(PageError(page_key, f"{type(exc).__name__}: {exc}"))
+                    yield page_key, PLACEHOLDER_TEXT
+                    continue
+                report.extracted_pages += 1
+                if cache is not None:
+                    cache.put_page(digest, extractor.name, i, text)
+
+            if text and text.strip():
+                yield page_key, text
+            else:
+                yield page_key, PLACEHOLDER_TEXT
+
+
+def write_pages_jsonl(pages: Iterable[Tuple[str, str]], jsonl_file) -> Iterator[Tuple[str, str]]:
+    """Append every page to ``jsonl_file`` as it arrives and pass it through.
+
+    Lets ingestion chunk and embed pages before the whole document is extracted.
+    Pages go to a ``.part`` file of their own, so concurrent writers of the same target
+    never share it; it is removed if extraction fails or the consumer stops early.
+    """
+    target = Path(jsonl_file)
+    fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".part")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for page_key, text in pages:
+                f.write(json.dumps({"page": page_key, "text": text}, ensure_ascii=False))
+                f.write("\n")
+                f.flush()
+                yield page_key, text
+        os.replace(tmp_path, jsonl_file)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def iter_jsonl_pages(jsonl_file) -> Iterator[Tuple[str, str]]:
+    """Read pages back from a ``pdf_to_jsonl`` file, one line at a time."""
+    with open(jsonl_file, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict) or "page" not in record:
+                raise ValueError(f"{jsonl_file}:{line_no}: expected an object with 'page' and 'text'")
+            yield str(record["page"]), record.get("text") or ""
+
+
+def pdf_to_jsonl(pdf_file, jsonl_file, backend: str | None = None) -> ExtractionReport:
+    """Streaming counterpart of ``pdf_to_json``: one JSON object per page per line."""
+    report = ExtractionReport()
     try:
-        with pdfplumber.open(pdf_file) as pdf:
-            result = {}
-            
-            for i, page in enumerate(pdf.pages):
-                text = page.extract_text()
-                
-                if text and text.strip():
-                    result[f"page_{i+1}"] = text
-                else:
-                    result[f"page_{i+1}"] = "Текст не найден"
-            
-            # Сохраняем в JSON
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
-            
-            return True
-            
-    except Exception as e:
-        return False
+        for _ in write_pages_jsonl(iter_pdf_pages(pdf_file, backend=backend, report=report), jsonl_file):
+            pass
+    except (PdfExtractionError, OSError) as exc:
+        report.ok = False
+        report.error = report.error or str(exc)
+    return report
+
+
+def pdf_to_json(pdf_file, json_file, backend: str | None = None) -> ExtractionReport:
+    """Write ``{page_key: text}`` for the whole document; the report lists per-page failures."""
+    report = ExtractionReport()
+    try:
+        result = dict(iter_pdf_pages(pdf_file, backend=backend, report=report))
+
+        # Сохраняем в JSON
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    except (PdfExtractionError, OSError) as exc:
+        report.ok = False
+        report.error = report.error or str(exc)
+    return report
+
 
 if __name__ == "__main__":
-    BASE_DIR = Path(__file__).resolve().parents[3]    
+    BASE_DIR = Path(__file__).resolve().parents[4]
+
+    DATA_DIR = BASE_DIR / "data"
 
-    DATA_DIR = BASE_DIR / "data/"
+    pdf_filename = DATA_DIR / "lections" / "Лекция 01.pdf"
+    json_filename = DATA_DIR / "output.json"
 
-    pdf_filename = DATA_DIR + "Лекция 01.pdf"
-    json_filename = DATA_DIR + "output.json"
-    
-    pdf_to_json(pdf_filename, json_filename)
\ No newline at end of file
+    print(pdf_to_json(pdf_filename, json_filename))
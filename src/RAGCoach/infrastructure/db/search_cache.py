@@ -0,0 +1,144 @@
+"""Memory-bounded LRU cache for search results, invalidated by per-collection versions.
+
+Every write path of ``QdrantService`` bumps the collection version, and the version is
+part of the cache key, so results cached before an ingest are never served after it.
+Versions live in a small SQLite file shared by every process on the host (all API
+workers, ``ingest_lectures``, snapshot imports); ``ttl`` only bounds staleness for
+writers on other hosts.
+"""
+from __future__ import annotations
+
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Hashable
+
+from ..paths import DATA_DIR
+
+
+DEFAULT_SEARCH_CACHE_BYTES = int(os.getenv("SEARCH_CACHE_BYTES", str(32 * 1024 * 1024)))
+DEFAULT_SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "300"))
+DEFAULT_COLLECTION_VERSIONS_PATH = os.getenv("COLLECTION_VERSIONS_PATH") or DATA_DIR / "collection_versions.sqlite"
+
+
+class CollectionVersions:
+    """Write counters per (Qdrant URL, collection), persisted in SQLite so other processes see bumps."""
+
+    def __init__(self, path: str | Path = DEFAULT_COLLECTION_VERSIONS_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS versions ("
+                "qdrant_url TEXT, collection TEXT, version INTEGER, PRIMARY KEY (qdrant_url, collection)"
+                ") WITHOUT ROWID"
+            )
+
+    def get(self, qdrant_url: str, collection: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM versions WHERE qdrant_url = ? AND collection = ?", (qdrant_url, collection)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, qdrant_url: str, collection: str) -> int:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO versions VALUES (?, ?, 1) "
+                "ON CONFLICT (qdrant_url, collection) DO UPDATE SET version = version + 1",
+                (qdrant_url, collection),
+            )
+            (version,) = self._conn.execute(
+                "SELECT version FROM versions WHERE qdrant_url = ? AND collection = ?", (qdrant_url, collection)
+            ).fetchone()
+        return version
+
+
+_default_versions: CollectionVersions | None = None
+_default_versions_lock = threading.Lock()
+
+
+def get_collection_versions() -> CollectionVersions:
+    global _default_versions
+    with _default_versions_lock:
+        if _default_versions is None:
+            _default_versions = CollectionVersions()
+        return _default_versions
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(question.split())
+
+
+class SearchCache:
+    def __init__(self, max_bytes: int = DEFAULT_SEARCH_CACHE_BYTES, ttl: float = DEFAULT_SEARCH_CACHE_TTL) -> None:
+        self.max_bytes = max(0, max_bytes)
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, int, list[dict]]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _estimate_size(value: list[dict]) -> int:
+        # Serialized size is a stable proxy for the Python objects held by the entry.
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+    def get(self, key: Hashable) -> list[dict] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl and time.monotonic() - entry[0] > self.ttl):
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[2]
+        # Callers may mutate results (e.g. hydrate payloads); never hand out the cached objects.
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: list[dict]) -> None:
+        size = self._estimate_size(value)
+        if size > self.max_bytes:
+            return
+        stored = copy.deepcopy(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic(), size, stored)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Shared by every QdrantService in the process; keys carry the collection name.
+default_search_cache = SearchCache()
@@ -0,0 +1,32 @@
+"""Local SQLite stores are scoped by (Qdrant URL, collection).
+
+The same collection name on two Qdrant instances sharing one data directory must not
+see (or wipe) each other's rows. Stores written before the URL was part of the key are
+rebuilt once, with their rows assigned to the ``QDRANT_URL`` of this deployment.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+
+
+LEGACY_QDRANT_URL = (os.getenv("QDRANT_URL") or "http://localhost:6333").rstrip("/")
+
+
+def ensure_scoped_table(conn: sqlite3.Connection, table: str, create_sql: str) -> None:
+    """Create ``table`` with ``create_sql`` (leading ``qdrant_url`` column), migrating an unscoped one.
+
+    Run inside a transaction; create indexes afterwards, since the old table's are dropped here.
+    """
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    if columns and "qdrant_url" not in columns:
+        legacy = f"{table}_unscoped"
+        conn.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        conn.execute(create_sql)
+        names = ", ".join(columns)
+        conn.execute(
+            f"INSERT INTO {table} (qdrant_url, {names}) SELECT ?, {names} FROM {legacy}", (LEGACY_QDRANT_URL,)
+        )
+        conn.execute(f"DROP TABLE {legacy}")
+    else:
+        conn.execute(create_sql)
@@ -1,3 +1,4 @@
 from .ollama_gateway import OllamaLLMGateway
+from .scheduler import LLMScheduler, Priority, ScheduledLLMGateway
 
-__all__ = ["OllamaLLMGateway"]
+__all__ = ["OllamaLLMGateway", "LLMScheduler", "Priority", "ScheduledLLMGateway"]
@@ -4,16 +4,28 @@ from ..settings import settings
 
 
 class OllamaLLMGateway(LLMGateway):
-    async def generate(self, prompt: str) -> str:
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        max_tokens: int | None = None,
+        stop: list[str] | None = None,
+        json_format: bool = False,
+    ) -> str:
+        options = {
+            "temperature": settings.llm_temperature,
+            "num_predict": max_tokens or settings.llm_max_tokens
+        }
+        if stop:
+            options["stop"] = stop
         payload = {
             "model": settings.ollama_model,
             "prompt": prompt,
             "stream": False,
-            "options": {
-                "temperature": settings.llm_temperature,
-                "num_predict": settings.llm_max_tokens
-            }
+            "options": options
         }
+        if json_format:
+            payload["format"] = "json"
 
         async with httpx.AsyncClient() as client:
             r = await client.post(
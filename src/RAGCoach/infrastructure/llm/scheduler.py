@@ -0,0 +1,237 @@
+"""Admission control in front of the LLM: concurrency cap, priority queues, deadline shedding.
+
+At most ``max_concurrency`` calls reach Ollama at once; ``interactive_reserve`` of those
+slots are kept free for interactive grading. Waiting calls are served strictly by priority
+(interactive > batch > freeform), FIFO within a class. A call is rejected with
+``LLMOverloadedError`` instead of queueing when its class queue is full or when the
+estimated wait (queue ahead of it x mean call time / slots) exceeds its deadline, and it is
+dropped from the queue once it has waited that long.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import AsyncIterator
+
+from ...application.ports.llm_gateway import LLMGateway, LLMOverloadedError
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BATCH = 1
+    FREEFORM = 2
+
+
+# Keeps the wait-time percentiles cheap and recent.
+_WAIT_SAMPLES = 1000
+# Weight of the newest call in the running mean call duration.
+_DURATION_ALPHA = 0.2
+
+
+@dataclass
+class _ClassStats:
+    admitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected_queue_full: int = 0
+    rejected_deadline: int = 0
+    expired_in_queue: int = 0
+    waits: deque = field(default_factory=lambda: deque(maxlen=_WAIT_SAMPLES))
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = 2,
+        interactive_reserve: int = 1,
+        queue_limits: dict[Priority, int] | None = None,
+        deadlines: dict[Priority, float] | None = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.interactive_reserve = min(max(0, interactive_reserve), self.max_concurrency - 1)
+        self.queue_limits = {Priority.INTERACTIVE: 32, Priority.BATCH: 64, Priority.FREEFORM: 16, **(queue_limits or {})}
+        self.deadlines = {Priority.INTERACTIVE: 30.0, Priority.BATCH: 300.0, Priority.FREEFORM: 60.0, **(deadlines or {})}
+        self._queues: dict[Priority, deque[asyncio.Future]] = {priority: deque() for priority in Priority}
+        self._active = 0
+        self._active_by_class = {priority: 0 for priority in Priority}
+        self._mean_duration: float | None = None
+        self._stats = {priority: _ClassStats() for priority in Priority}
+
+    def _slots_for(self, priority: Priority) -> int:
+        return self.max_concurrency if priority == Priority.INTERACTIVE else self.max_concurrency - self.interactive_reserve
+
+    def _can_start(self, priority: Priority) -> bool:
+        return self._active < self._slots_for(priority)
+
+    def _queued_ahead(self, priority: Priority) -> int:
+        return sum(len(self._queues[p]) for p in Priority if p <= priority)
+
+    def _estimated_wait(self, priority: Priority) -> float | None:
+        if self._mean_duration is None:
+            return None
+        # Calls ahead, plus the ones holding slots, drain through the slots this class may use.
+        work = self._queued_ahead(priority) + self._active
+        return work * self._mean_duration / self._slots_for(priority)
+
+    def _retry_after(self, priority: Priority) -> float:
+        estimate = self._estimated_wait(priority)
+        return max(1.0, estimate if estimate is not None else self.deadlines[priority] / 4)
+
+    async def _acquire(self, priority: Priority) -> float:
+        stats = self._stats[priority]
+        if self._queued_ahead(priority) == 0 and self._can_start(priority):
+            self._start(priority)
+            stats.waits.append(0.0)
+            return 0.0
+
+        if len(self._queues[priority]) >= self.queue_limits[priority]:
+            stats.rejected_queue_full += 1
+            raise LLMOverloadedError(
+                f"LLM queue for {priority.name.lower()} calls is full", retry_after=self._retry_after(priority)
+            )
+        deadline = self.deadlines[priority]
+        estimate = self._estimated_wait(priority)
+        if estimate is not None and estimate > deadline:
+            stats.rejected_deadline += 1
+            raise LLMOverloadedError(
+                f"Estimated LLM wait {estimate:.0f}s exceeds the {deadline:.0f}s budget for {priority.name.lower()} calls",
+                retry_after=estimate,
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues[priority].append(waiter)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=deadline)
+        except asyncio.TimeoutError:
+            self._abandon(priority, waiter)
+            stats.expired_in_queue += 1
+            raise LLMOverloadedError(
+                f"LLM call waited {deadline:.0f}s in the {priority.name.lower()} queue",
+                retry_after=self._retry_after(priority),
+            ) from None
+        except asyncio.CancelledError:
+            # Client went away while queued.
+            self._abandon(priority, waiter)
+            raise
+        waited = time.monotonic() - started
+        stats.waits.append(waited)
+        return waited
+
+    def _abandon(self, priority: Priority, waiter: asyncio.Future) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # The slot was granted just as we gave up; hand it on.
+            self._release(priority)
+        else:
+            waiter.cancel()
+            try:
+                self._queues[priority].remove(waiter)
+            except ValueError:
+                pass
+
+    def _start(self, priority: Priority) -> None:
+        self._active += 1
+        self._active_by_class[priority] += 1
+        self._stats[priority].admitted += 1
+
+    def _release(self, priority: Priority) -> None:
+        self._active -= 1
+        self._active_by_class[priority] -= 1
+        self._wake_next()
+
+    def _wake_next(self) -> None:
+        for priority in Priority:
+            queue = self._queues[priority]
+            while queue and self._can_start(priority):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self._start(priority)
+                waiter.set_result(None)
+            if queue:
+                # Strict priority: lower classes never overtake a waiting higher class.
+                return
+
+    def _record_duration(self, seconds: float) -> None:
+        if self._mean_duration is None:
+            self._mean_duration = seconds
+        else:
+            self._mean_duration += _DURATION_ALPHA * (seconds - self._mean_duration)
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority) -> AsyncIterator[float]:
+        """Hold one LLM slot for the body; yields how long the call waited in the queue."""
+        waited = await self._acquire(priority)
+        started = time.monotonic()
+        ok = False
+        try:
+            yield waited
+            ok = True
+        finally:
+            self._record_duration(time.monotonic() - started)
+            stats = self._stats[priority]
+            if ok:
+                stats.completed += 1
+            else:
+                stats.failed += 1
+            self._release(priority)
+
+    def metrics(self) -> dict:
+        classes = {}
+        for priority in Priority:
+            stats = self._stats[priority]
+            waits = sorted(stats.waits)
+            classes[priority.name.lower()] = {
+                "queue_depth": len(self._queues[priority]),
+                "queue_limit": self.queue_limits[priority],
+                "deadline_seconds": self.deadlines[priority],
+                "active": self._active_by_class[priority],
+                "admitted": stats.admitted,
+                "completed": stats.completed,
+                "failed": stats.failed,
+                "rejected_queue_full": stats.rejected_queue_full,
+                "rejected_deadline": stats.rejected_deadline,
+                "expired_in_queue": stats.expired_in_queue,
+                "wait_p50_seconds": _percentile(waits, 50),
+                "wait_p95_seconds": _percentile(waits, 95),
+                "wait_max_seconds": waits[-1] if waits else None,
+            }
+        return {
+            "max_concurrency": self.max_concurrency,
+            "interactive_reserve": self.interactive_reserve,
+            "active": self._active,
+            "mean_call_seconds": self._mean_duration,
+            "classes": classes,
+        }
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float | None:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class ScheduledLLMGateway(LLMGateway):
+    """``LLMGateway`` that runs every call of one priority class through an ``LLMScheduler``."""
+
+    def __init__(self, inner: LLMGateway, scheduler: LLMScheduler, priority: Priority):
+        self.inner = inner
+        self.scheduler = scheduler
+        self.priority = priority
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        max_tokens: int | None = None,
+        stop: list[str] | None = None,
+        json_format: bool = False,
+    ) -> str:
+        async with self.scheduler.slot(self.priority):
+            return await self.inner.generate(prompt, max_tokens=max_tokens, stop=stop, json_format=json_format)
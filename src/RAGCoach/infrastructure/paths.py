@@ -0,0 +1,12 @@
+"""Location of local state (uploads, SQLite stores, caches), independent of the working directory.
+
+``RAGCOACH_DATA_DIR`` overrides it; in a source checkout it is the repository's ``data/``.
+Explicit per-store paths (``CHUNK_STORE_PATH`` etc.) still win over the defaults below.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+DATA_DIR = Path(os.getenv("RAGCOACH_DATA_DIR") or Path(__file__).resolve().parents[3] / "data")
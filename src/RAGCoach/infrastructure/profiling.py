@@ -0,0 +1,168 @@
+"""Opt-in cProfile hooks for API requests and CLI scripts.
+
+With ``PROFILE_MODE=off`` (default) nothing is installed: ``profiled`` returns the
+endpoint unchanged and no middleware is added. Artifacts are ``pstats`` dumps
+(open with ``python -m pstats`` or snakeviz); only the newest ``PROFILE_KEEP`` are kept.
+"""
+from __future__ import annotations
+
+import cProfile
+import functools
+import inspect
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable
+
+from .settings import settings
+
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_PATH_HEADER = "X-Profile-Path"
+PROFILE_SKIPPED_HEADER = "X-Profile-Skipped"
+
+# Set by the middleware for requests that should be profiled; the endpoint wrapper fills in "path".
+# Context is copied into Starlette's threadpool, so sync endpoints see it too.
+_request_profile: ContextVar[dict | None] = ContextVar("ragcoach_request_profile", default=None)
+
+# One request profile at a time per process: on Python 3.12+ a second enable() raises
+# ("Another profiling tool is already active"), and before that concurrent profilers on the
+# event loop thread replace each other's hook. Requests that find it taken run unprofiled.
+_profiler_lock = threading.Lock()
+
+
+class ProfileStore:
+    """Writes profile artifacts into ``directory`` and keeps only the newest ``keep`` files."""
+
+    def __init__(self, directory: str | Path = settings.profile_dir, keep: int = settings.profile_keep) -> None:
+        self.directory = Path(directory)
+        self.keep = max(1, keep)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def _next_path(self, label: str) -> Path:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        safe_label = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in label)
+        return self.directory / f"{stamp}-{next(self._counter):05d}-{safe_label}.prof"
+
+    def save(self, profile: cProfile.Profile, label: str) -> Path:
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._next_path(label)
+            profile.dump_stats(path)
+            self._prune()
+        return path
+
+    def _prune(self) -> None:
+        artifacts = sorted(self.directory.glob("*.prof"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for stale in artifacts[self.keep :]:
+            stale.unlink(missing_ok=True)
+
+    def run(self, label: str, fn: Callable[..., Any], *args, **kwargs) -> tuple[Any, Path]:
+        """Call ``fn`` under cProfile and return ``(result, artifact_path)``."""
+        profile = cProfile.Profile()
+        try:
+            result = profile.runcall(fn, *args, **kwargs)
+        finally:
+            path = self.save(profile, label)
+        return result, path
+
+
+_store: ProfileStore | None = None
+
+
+def get_profile_store() -> ProfileStore:
+    global _store
+    if _store is None:
+        _store = ProfileStore()
+    return _store
+
+
+def profiled(label: str | None = None):
+    """Profile an endpoint when the current request asked for it (see ``install_profiling``).
+
+    Async endpoints are profiled on the event loop thread, so other requests interleaving
+    at ``await`` points show up in their profile too. Only one request is profiled at a
+    time; the others get ``X-Profile-Skipped: busy`` instead of an artifact.
+    """
+
+    def decorator(fn):
+        if settings.profile_mode == "off":
+            return fn
+        name = label or fn.__name__
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                state = _request_profile.get()
+                if state is None or state.get("active"):
+                    return await fn(*args, **kwargs)
+                state["active"] = True
+                if not _profiler_lock.acquire(blocking=False):
+                    state["skipped"] = "busy"
+                    return await fn(*args, **kwargs)
+                try:
+                    profile = cProfile.Profile()
+                    profile.enable()
+                    try:
+                        return await fn(*args, **kwargs)
+                    finally:
+                        profile.disable()
+                        state["path"] = str(get_profile_store().save(profile, name))
+                finally:
+                    _profiler_lock.release()
+
+            wrapper = async_wrapper
+        else:
+
+            @functools.wraps(fn)
+            def sync_wrapper(*args, **kwargs):
+                state = _request_profile.get()
+                if state is None or state.get("active"):
+                    return fn(*args, **kwargs)
+                state["active"] = True
+                if not _profiler_lock.acquire(blocking=False):
+                    state["skipped"] = "busy"
+                    return fn(*args, **kwargs)
+                try:
+                    profile = cProfile.Profile()
+                    try:
+                        return profile.runcall(fn, *args, **kwargs)
+                    finally:
+                        state["path"] = str(get_profile_store().save(profile, name))
+                finally:
+                    _profiler_lock.release()
+
+            wrapper = sync_wrapper
+
+        # FastAPI resolves annotations against the wrapper's globals; hand it the resolved signature.
+        wrapper.__signature__ = inspect.signature(fn, eval_str=True)
+        return wrapper
+
+    return decorator
+
+
+def install_profiling(app) -> None:
+    """Add the request-selection middleware to a FastAPI app unless profiling is off."""
+    mode = settings.profile_mode
+    if mode == "off":
+        return
+
+    @app.middleware("http")
+    async def profile_requests(request, call_next):
+        if mode != "always" and request.headers.get(PROFILE_HEADER, "").lower() not in ("1", "true", "yes"):
+            return await call_next(request)
+        state: dict = {}
+        token = _request_profile.set(state)
+        try:
+            response = await call_next(request)
+        finally:
+            _request_profile.reset(token)
+        if state.get("path"):
+            response.headers[PROFILE_PATH_HEADER] = state["path"]
+        elif state.get("skipped"):
+            response.headers[PROFILE_SKIPPED_HEADER] = state["skipped"]
+        return response
@@ -1,5 +1,9 @@
+from pathlib import Path
+
 from pydantic_settings import BaseSettings
 
+from .paths import DATA_DIR
+
 class Settings(BaseSettings):
     llm_provider: str = "ollama"
 
@@ -8,6 +12,26 @@ class Settings(BaseSettings):
 
     llm_temperature: float = 0.2
     llm_max_tokens: int = 800
+    # Cap for score-only grading; the JSON answer is ~15 tokens.
+    llm_fast_max_tokens: int = 32
+
+    # LLM admission control: concurrent Ollama calls, slots kept for interactive grading,
+    # queue bounds and the longest wait (seconds) per class before a call is shed with 429.
+    # All of these apply per process: with N API workers Ollama sees up to N x llm_max_concurrency
+    # calls, so divide the Ollama capacity (OLLAMA_NUM_PARALLEL) by the worker count.
+    llm_max_concurrency: int = 2
+    llm_interactive_reserve: int = 1
+    llm_queue_interactive: int = 32
+    llm_queue_batch: int = 64
+    llm_queue_freeform: int = 16
+    llm_deadline_interactive: float = 30.0
+    llm_deadline_batch: float = 300.0
+    llm_deadline_freeform: float = 60.0
+
+    # off: no hooks installed; header: profile requests sent with X-Profile: 1; always: every request
+    profile_mode: str = "off"
+    profile_dir: Path = DATA_DIR / "profiles"
+    profile_keep: int = 50
 
     class Config:
         env_file = ".env"
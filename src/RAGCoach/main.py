@@ -1,13 +1,48 @@
 from .infrastructure.llm.ollama_gateway import OllamaLLMGateway
+from .infrastructure.llm.scheduler import LLMScheduler, Priority, ScheduledLLMGateway
 from .application.use_cases.evaluate_with_rag import EvaluateWithRagUseCase
 from .application.use_cases.grade_answer import GradeAnswerUseCase
+from .infrastructure.settings import settings
+
+
+_llm_scheduler: LLMScheduler | None = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """One scheduler per process, shared by every use case that talks to Ollama.
+
+    The limits are per process: N API workers send up to N x ``llm_max_concurrency``
+    calls to Ollama.
+    """
+    global _llm_scheduler
+    if _llm_scheduler is None:
+        _llm_scheduler = LLMScheduler(
+            max_concurrency=settings.llm_max_concurrency,
+            interactive_reserve=settings.llm_interactive_reserve,
+            queue_limits={
+                Priority.INTERACTIVE: settings.llm_queue_interactive,
+                Priority.BATCH: settings.llm_queue_batch,
+                Priority.FREEFORM: settings.llm_queue_freeform,
+            },
+            deadlines={
+                Priority.INTERACTIVE: settings.llm_deadline_interactive,
+                Priority.BATCH: settings.llm_deadline_batch,
+                Priority.FREEFORM: settings.llm_deadline_freeform,
+            },
+        )
+    return _llm_scheduler
 
 
 def build_rag_evaluator():
-    llm = OllamaLLMGateway()
+    llm = ScheduledLLMGateway(OllamaLLMGateway(), get_llm_scheduler(), Priority.FREEFORM)
     return EvaluateWithRagUseCase(llm)
 
 
 def build_grader():
-    llm = OllamaLLMGateway()
-    return GradeAnswerUseCase(llm)
+    ollama = OllamaLLMGateway()
+    scheduler = get_llm_scheduler()
+    return GradeAnswerUseCase(
+        ScheduledLLMGateway(ollama, scheduler, Priority.INTERACTIVE),
+        fast_max_tokens=settings.llm_fast_max_tokens,
+        batch_llm=ScheduledLLMGateway(ollama, scheduler, Priority.BATCH),
+    )
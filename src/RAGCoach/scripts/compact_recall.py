@@ -0,0 +1,144 @@
+"""Offline recall@k check for two-stage search (compact prefilter + full-vector rescoring).
+
+Pulls the full vectors of a collection, embeds the questions file and compares,
+for every candidate compact dimension, the two-stage top-k against exact search.
+PCA is fitted on part of the collection and recall is measured on the held-out rest,
+so the numbers reflect lectures ingested after the projection was saved.
+Optionally saves the PCA projection to use with QDRANT_COMPACT_PROJECTION.
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from ragcoach.embeddings import CompactProjection
+from ragcoach.infrastructure.db import QdrantService
+from ragcoach.infrastructure.db.qdrant_service import FULL_VECTOR
+
+
+def load_full_vectors(service: QdrantService, batch_size: int = 1024) -> np.ndarray:
+    rows = []
+    for point in service.scroll_points(batch_size=batch_size, with_vectors=True):
+        vector = point.vector
+        rows.append(vector[FULL_VECTOR] if isinstance(vector, dict) else vector)
+    if not rows:
+        raise ValueError(f"Collection '{service.collection}' has no vectors")
+    return np.asarray(rows, dtype=np.float32)
+
+
+def split_holdout(vectors: np.ndarray, holdout: float, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """``(fit, evaluate)`` rows; with ``holdout=0`` both are the whole collection (optimistic recall)."""
+    if not 0 <= holdout < 1:
+        raise ValueError(f"Holdout fraction must be in [0, 1), got {holdout}")
+    if holdout == 0:
+        return vectors, vectors
+    order = np.random.default_rng(seed).permutation(len(vectors))
+    n_eval = max(1, int(round(len(vectors) * holdout)))
+    if len(vectors) - n_eval < 2:
+        raise ValueError(f"Collection has {len(vectors)} vectors; too few to hold out {holdout:.0%} for evaluation")
+    return vectors[order[n_eval:]], vectors[order[:n_eval]]
+
+
+def load_questions(path: Path) -> list[str]:
+    lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
+    return [line.strip() for line in lines if line.strip()]
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Row-wise indices of the k highest scores, best first."""
+    k = min(k, scores.shape[1])
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1)
+    return np.take_along_axis(part, order, axis=1)
+
+
+def recall_at_k(approx: np.ndarray, exact: np.ndarray) -> float:
+    hits = [len(set(a) & set(e)) / len(e) for a, e in zip(approx.tolist(), exact.tolist())]
+    return float(np.mean(hits))
+
+
+def evaluate(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    projection: CompactProjection,
+    top_k: int,
+    oversample: int,
+) -> dict:
+    exact = top_k_indices(queries @ vectors.T, top_k)
+
+    compact_vectors = projection.transform(vectors)
+    compact_queries = projection.transform(queries)
+    compact_scores = compact_queries @ compact_vectors.T
+    compact_only = top_k_indices(compact_scores, top_k)
+
+    candidates = top_k_indices(compact_scores, top_k * oversample)
+    rescored = np.einsum("qd,qcd->qc", queries, vectors[candidates])
+    two_stage = np.take_along_axis(candidates, top_k_indices(rescored, top_k), axis=1)
+
+    return {
+        "dim": projection.dim_out,
+        "bytes_per_vector": projection.dim_out * 4,
+        "recall_compact_only": recall_at_k(compact_only, exact),
+        "recall_two_stage": recall_at_k(two_stage, exact),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Recall@k of compact prefilter + rescoring vs exact search")
+    parser.add_argument("--collection", default=None, help="Qdrant collection name")
+    parser.add_argument("--embedding-model", default=None, help="Embedding model used for the collection")
+    parser.add_argument("--qdrant-url", default=None, help="Qdrant URL")
+    parser.add_argument("--qdrant-api-key", default=None, help="Qdrant API key")
+    parser.add_argument("--questions-file", default="data/questions.txt", help="Queries, one per line")
+    parser.add_argument("--dims", default="32,64,128,256", help="Comma-separated compact dimensions to try")
+    parser.add_argument("--top-k", type=int, default=5, help="k for recall@k")
+    parser.add_argument("--oversample", type=int, default=4, help="Candidates per result in the first pass")
+    parser.add_argument("--method", choices=("pca", "random"), default="pca", help="How to build the projection")
+    parser.add_argument(
+        "--holdout",
+        type=float,
+        default=0.2,
+        help="Share of the collection kept out of the PCA fit and searched for recall (0 = fit and search all)",
+    )
+    parser.add_argument("--save-dim", type=int, default=None, help="Save the projection of this dimension")
+    parser.add_argument("--save-path", default="data/compact_projection.npz", help="Where to save the projection")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    service_kwargs = {
+        "collection": args.collection,
+        "qdrant_url": args.qdrant_url,
+        "qdrant_api_key": args.qdrant_api_key,
+    }
+    if args.embedding_model:
+        service_kwargs["embedding_model"] = args.embedding_model
+    service = QdrantService(**service_kwargs)
+
+    vectors = load_full_vectors(service)
+    fit_vectors, eval_vectors = split_holdout(vectors, args.holdout)
+    queries = np.asarray(service.embedder.encode(load_questions(Path(args.questions_file))), dtype=np.float32)
+    print(f"Collection '{service.collection}': {len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries")
+    print(f"PCA fitted on {len(fit_vectors)} vectors, recall measured on {len(eval_vectors)} held-out vectors")
+    print(f"{'dim':>5} {'bytes':>6} {'recall@k compact':>17} {'recall@k two-stage':>19}")
+
+    for dim in [int(d) for d in args.dims.split(",") if d.strip()]:
+        if args.method == "pca":
+            projection = CompactProjection.fit_pca(fit_vectors, dim)
+        else:
+            projection = CompactProjection.random(vectors.shape[1], dim)
+        row = evaluate(eval_vectors, queries, projection, args.top_k, args.oversample)
+        print(
+            f"{row['dim']:>5} {row['bytes_per_vector']:>6} "
+            f"{row['recall_compact_only']:>17.3f} {row['recall_two_stage']:>19.3f}"
+        )
+        if args.save_dim == dim:
+            projection.save(args.save_path)
+            print(f"      saved projection to {args.save_path}")
+
+
+if __name__ == "__main__":
+    main()
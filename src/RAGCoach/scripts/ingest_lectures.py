@@ -1,17 +1,54 @@
-"""Bulk pipeline: PDFs -> JSON (pdf_to_json) -> Qdrant ingest."""
+"""Bulk pipeline: PDFs -> JSONL/JSON (pdf_to_jsonl/pdf_to_json) -> Qdrant ingest."""
 from __future__ import annotations
 
 import argparse
+import time
+from contextlib import ExitStack
 from pathlib import Path
+from typing import Iterator
 
-from ragcoach.infrastructure.db import QdrantService, pdf_to_json
+from ragcoach.embeddings import EmbeddingPool
+from ragcoach.infrastructure.db import (
+    EXTRACTORS,
+    ExtractionReport,
+    PdfExtractionError,
+    QdrantService,
+    iter_pdf_pages,
+    pdf_to_json,
+    write_pages_jsonl,
+)
+from ragcoach.infrastructure.db.qdrant_service import DEFAULT_INGEST_BATCH_SIZE, DEFAULT_MODEL
+from ragcoach.infrastructure.db.reader_pdf import get_page_cache
+from ragcoach.infrastructure.profiling import get_profile_store
 
 
-def convert_pdf(pdf_path: Path, json_dir: Path) -> Path:
+def convert_pdf(pdf_path: Path, json_dir: Path, pdf_backend: str | None = None) -> tuple[Path, ExtractionReport]:
     json_dir.mkdir(parents=True, exist_ok=True)
     json_path = json_dir / f"{pdf_path.stem}.json"
-    pdf_to_json(str(pdf_path), str(json_path))
-    return json_path
+    return json_path, pdf_to_json(str(pdf_path), str(json_path), backend=pdf_backend)
+
+
+def stream_pdf(
+    pdf_path: Path, json_dir: Path, pdf_backend: str | None = None
+) -> tuple[Path, Iterator[tuple[str, str]], ExtractionReport]:
+    """Lazily extract pages into ``<stem>.jsonl``; pages are written as they are consumed.
+
+    The returned report fills in while the pages are consumed.
+    """
+    json_dir.mkdir(parents=True, exist_ok=True)
+    jsonl_path = json_dir / f"{pdf_path.stem}.jsonl"
+    report = ExtractionReport()
+    pages = iter_pdf_pages(str(pdf_path), backend=pdf_backend, report=report)
+    return jsonl_path, write_pages_jsonl(pages, str(jsonl_path)), report
+
+
+def print_extraction(report: ExtractionReport) -> None:
+    print(
+        f"    Extracted {report.extracted_pages} pages with {report.backend}, "
+        f"{report.cached_pages} from the page cache, {len(report.errors)} failed"
+    )
+    for error in report.errors:
+        print(f"    ! {error.page}: {error.error}")
 
 
 def ingest_all(
@@ -22,6 +59,11 @@ def ingest_all(
     embedding_model: str | None = None,
     qdrant_url: str | None = None,
     qdrant_api_key: str | None = None,
+    output_format: str = "jsonl",
+    workers: int = 0,
+    threads_per_worker: int = 1,
+    chunk_overlap: int = 0,
+    pdf_backend: str | None = None,
 ) -> None:
     pdf_dir = pdf_dir.expanduser().resolve()
     json_dir = json_dir.expanduser().resolve()
@@ -33,41 +75,177 @@ def ingest_all(
         print(f"No PDF files found in {pdf_dir}")
         return
 
-    service = QdrantService(
-        collection=collection,
-        embedding_model=embedding_model or QdrantService.DEFAULT_MODEL,  # type: ignore[attr-defined]
-        chunk_words=chunk_words,
-        qdrant_url=qdrant_url,
-        qdrant_api_key=qdrant_api_key,
-    )
+    with ExitStack() as stack:
+        pool = None
+        batch_size = DEFAULT_INGEST_BATCH_SIZE
+        if workers > 0:
+            pool = stack.enter_context(
+                EmbeddingPool(embedding_model or DEFAULT_MODEL, workers=workers, threads_per_worker=threads_per_worker)
+            )
+            # Keep every worker busy: one ingest batch should cover several shards per worker.
+            batch_size = max(batch_size, pool.workers * pool.shard_size * 2)
+            print(f"[+] Bulk mode: {pool.workers} embedding workers x {pool.threads_per_worker} threads")
 
+        service = QdrantService(
+            collection=collection,
+            embedding_model=embedding_model or DEFAULT_MODEL,
+            chunk_words=chunk_words,
+            chunk_overlap=chunk_overlap,
+            qdrant_url=qdrant_url,
+            qdrant_api_key=qdrant_api_key,
+            ingest_batch_size=batch_size,
+            embedder=pool,
+        )
+        _ingest_files(service, pdf_files, json_dir, output_format, pdf_backend)
+
+
+def _ingest_files(
+    service: QdrantService,
+    pdf_files: list[Path],
+    json_dir: Path,
+    output_format: str,
+    pdf_backend: str | None = None,
+) -> None:
+    started = time.perf_counter()
     total_inserted = 0
+    total_dropped = 0
     for pdf_path in pdf_files:
-        print(f"[+] Converting {pdf_path.name} -> JSON")
-        json_path = convert_pdf(pdf_path, json_dir)
+        if output_format == "json":
+            print(f"[+] Converting {pdf_path.name} -> JSON")
+            json_path, extraction = convert_pdf(pdf_path, json_dir, pdf_backend)
+            if not extraction:
+                print(f"    ! Skipped: {extraction.error}")
+                continue
+            print_extraction(extraction)
 
-        print(f"[+] Ingesting {json_path.name} into Qdrant (source={pdf_path.stem})")
-        inserted = service.ingest_json(json_path, source_name=pdf_path.stem)
+            print(f"[+] Ingesting {json_path.name} into Qdrant (source={pdf_path.stem})")
+            inserted = service.ingest_json(json_path, source_name=pdf_path.stem)
+        else:
+            jsonl_path, pages, extraction = stream_pdf(pdf_path, json_dir, pdf_backend)
+            print(f"[+] Streaming {pdf_path.name} -> {jsonl_path.name} -> Qdrant (source={pdf_path.stem})")
+            try:
+                report = service.ingest_pages(pages, source=pdf_path.stem)
+            except PdfExtractionError as exc:
+                print(f"    ! Skipped: {exc}")
+                continue
+            print_extraction(extraction)
+            inserted = report.inserted
+            total_dropped += report.dropped
+            print(
+                f"    Skipped {report.skipped_pages} empty pages, dropped {report.exact_duplicates} exact "
+                f"and {report.near_duplicates} near-duplicate chunks"
+            )
         total_inserted += inserted
         print(f"    Inserted {inserted} chunks")
 
-    print(f"Done. Total chunks inserted: {total_inserted}")
+    elapsed = time.perf_counter() - started
+    rate = total_inserted / elapsed if elapsed else 0.0
+    print(
+        f"Done. Total chunks inserted: {total_inserted} (duplicates dropped: {total_dropped}) "
+        f"in {elapsed:.1f}s ({rate:.1f} chunks/s)"
+    )
+
+
+def benchmark_workers(
+    pdf_dir: Path,
+    chunk_words: int,
+    worker_counts: list[int],
+    threads_per_worker: int,
+    embedding_model: str | None = None,
+) -> None:
+    """Embed all lecture chunks once per worker count and report throughput (no Qdrant writes)."""
+    pdf_files = sorted(pdf_dir.expanduser().resolve().glob("*.pdf"))
+    texts = [
+        chunk
+        for pdf_path in pdf_files
+        for _, text in iter_pdf_pages(str(pdf_path))
+        for chunk in QdrantService.chunk_text(text, chunk_words)
+    ]
+    if not texts:
+        print(f"No text found in {pdf_dir}")
+        return
+
+    print(f"Embedding {len(texts)} chunks from {len(pdf_files)} PDFs, {threads_per_worker} thread(s) per worker")
+    print(f"{'workers':>8} {'seconds':>9} {'chunks/s':>10}")
+    for count in worker_counts:
+        with EmbeddingPool(
+            embedding_model or DEFAULT_MODEL, workers=count, threads_per_worker=threads_per_worker
+        ) as pool:
+            # Warm-up spawns every worker and loads its model outside the timed run.
+            pool.encode(texts[: pool.workers * pool.shard_size])
+            started = time.perf_counter()
+            pool.encode(texts)
+            elapsed = time.perf_counter() - started
+        print(f"{count:>8} {elapsed:>9.2f} {len(texts) / elapsed:>10.1f}")
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Convert PDFs to JSON and ingest into Qdrant")
     parser.add_argument("--pdf-dir", default="data/lectures", help="Directory with PDF lectures")
     parser.add_argument("--json-dir", default="data/json", help="Where to store intermediate JSON files")
+    parser.add_argument(
+        "--format",
+        choices=("jsonl", "json"),
+        default="jsonl",
+        help="Intermediate format: jsonl streams pages into ingestion, json writes the whole document first",
+    )
     parser.add_argument("--chunk-words", type=int, default=150, help="Words per chunk for splitting pages")
+    parser.add_argument("--chunk-overlap", type=int, default=0, help="Words shared by consecutive chunks")
+    parser.add_argument(
+        "--pdf-backend", choices=tuple(EXTRACTORS), default=None, help="PDF text extractor (defaults to PDF_BACKEND)"
+    )
     parser.add_argument("--collection", default=None, help="Qdrant collection name (defaults to env/QdrantService default)")
     parser.add_argument("--embedding-model", default=None, help="Embedding model name (defaults to env/QdrantService default)")
     parser.add_argument("--qdrant-url", default=None, help="Qdrant URL (defaults to env/QdrantService default)")
     parser.add_argument("--qdrant-api-key", default=None, help="Qdrant API key")
+    parser.add_argument(
+        "--workers", type=int, default=0, help="Embedding worker processes for bulk mode (0 = in-process model)"
+    )
+    parser.add_argument("--threads-per-worker", type=int, default=1, help="Torch threads pinned per embedding worker")
+    parser.add_argument(
+        "--benchmark-workers",
+        default=None,
+        help="Comma-separated worker counts (e.g. 1,2,4,8,16); report embedding throughput and exit",
+    )
+    parser.add_argument(
+        "--prune-page-cache",
+        type=float,
+        default=None,
+        metavar="DAYS",
+        help="Drop page cache entries not used for DAYS days and exit",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Run under cProfile and save the artifact to PROFILE_DIR (embedding workers are not profiled)",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
+    if args.prune_page_cache is not None:
+        cache = get_page_cache()
+        removed = cache.prune(max_age_days=args.prune_page_cache)
+        print(f"Removed {removed} documents from {cache.path}")
+        return
+    if args.benchmark_workers:
+        benchmark_workers(
+            pdf_dir=Path(args.pdf_dir),
+            chunk_words=args.chunk_words,
+            worker_counts=[int(n) for n in args.benchmark_workers.split(",") if n.strip()],
+            threads_per_worker=args.threads_per_worker,
+            embedding_model=args.embedding_model,
+        )
+        return
+    if args.profile:
+        _, path = get_profile_store().run("ingest_lectures", run_ingest, args)
+        print(f"Profile written to {path}")
+    else:
+        run_ingest(args)
+
+
+def run_ingest(args: argparse.Namespace) -> None:
     ingest_all(
         pdf_dir=Path(args.pdf_dir),
         json_dir=Path(args.json_dir),
@@ -76,6 +254,11 @@ def main() -> None:
         embedding_model=args.embedding_model,
         qdrant_url=args.qdrant_url,
         qdrant_api_key=args.qdrant_api_key,
+        output_format=args.format,
+        workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        chunk_overlap=args.chunk_overlap,
+        pdf_backend=args.pdf_backend,
     )
 
 
@@ -0,0 +1,366 @@
+"""Offline load test for the API with a fake Ollama and an in-memory Qdrant.
+
+Starts a fake Ollama (tokens emitted at a configurable rate, limited parallel slots),
+runs ``ragcoach.api`` in one uvicorn server against ``QDRANT_URL=:memory:``, and
+drives it with a traffic mix of random_question/search/grade/upload requests while
+ramping concurrency. Prints throughput, latency percentiles and error rates per
+endpoint and level, so the saturation point of one worker is visible.
+
+    python -m ragcoach.scripts.load_test --concurrency 1,2,4,8,16,32 --duration 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+import numpy as np
+import uvicorn
+
+
+BASE_DIR = Path(__file__).resolve().parents[3]
+DATA_DIR = BASE_DIR / "data"
+
+FAKE_ANSWER = "Оценка: 7. Пояснение: ответ в целом верный, но не хватает деталей и примеров из лекции."
+FAKE_JSON_ANSWER = '{"manipulation_warning": false, "score": 7'
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words embedder; stands in for e5 when model weights are not the subject."""
+
+    def __init__(self, dim: int = 768):
+        self.dim = dim
+        self.dtype = np.dtype(np.float32)
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                bucket = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=4).digest(), "little")
+                matrix[row, bucket % self.dim] += 1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1.0, norms)
+        return matrix
+
+
+def build_fake_ollama(tokens_per_second: float, response_tokens: int, ttft: float, parallel: int):
+    """Minimal ``/api/generate`` that sleeps like a model decoding ``response_tokens`` tokens."""
+    from fastapi import FastAPI
+
+    app = FastAPI(title="fake-ollama")
+    slots = asyncio.Semaphore(max(1, parallel))
+
+    @app.post("/api/generate")
+    async def generate(body: dict):
+        limit = int((body.get("options") or {}).get("num_predict") or response_tokens)
+        # JSON (score-only) answers stop at the closing brace after ~15 tokens.
+        answer, tokens = (FAKE_JSON_ANSWER, 15) if body.get("format") == "json" else (FAKE_ANSWER, response_tokens)
+        tokens = min(tokens, limit)
+        async with slots:
+            await asyncio.sleep(ttft + tokens / tokens_per_second)
+        return {"model": body.get("model"), "response": answer, "done": True, "eval_count": tokens}
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_in_thread(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Server on port {port} did not start")
+        time.sleep(0.05)
+    return server
+
+
+def seed_collection(service, pdf_dir: Path, page_cache=None) -> None:
+    """Fill the collection before traffic starts, so searches never hit a missing collection.
+
+    Uses ``data/output.json`` when it holds pages, otherwise the first lecture PDF
+    (through ``page_cache`` when given, uncached otherwise).
+    """
+    from ragcoach.infrastructure.db import iter_pdf_pages
+
+    seed_json = DATA_DIR / "output.json"
+    if seed_json.exists() and seed_json.stat().st_size:
+        try:
+            inserted = service.ingest_json(seed_json, source_name="seed")
+        except ValueError as exc:
+            print(f"Ignoring seed file {seed_json.name}: {exc}")
+        else:
+            print(f"Seeded in-memory collection with {inserted} chunks from {seed_json.name}")
+    if not service.point_count():
+        pdfs = sorted(pdf_dir.glob("*.pdf"))
+        if pdfs:
+            pages = iter_pdf_pages(str(pdfs[0]), cache=page_cache, use_cache=page_cache is not None)
+            report = service.ingest_pages(pages, source=pdfs[0].stem)
+            print(f"Seeded in-memory collection with {report.inserted} chunks from {pdfs[0].name}")
+    if not service.point_count():
+        raise RuntimeError(f"Nothing to seed the collection with: {seed_json} is empty and {pdf_dir} has no PDFs")
+
+
+def start_stack(args: argparse.Namespace, work_dir: Path) -> tuple[str, list[uvicorn.Server]]:
+    """Fake Ollama + in-memory Qdrant + the real API app, each on a local port."""
+    ollama_port = free_port()
+    ollama = serve_in_thread(
+        build_fake_ollama(args.ollama_tokens_per_sec, args.ollama_tokens, args.ollama_ttft, args.ollama_parallel),
+        ollama_port,
+    )
+
+    from ragcoach import api
+    from ragcoach.infrastructure.db import IngestRegistry, PageCache, QdrantService
+    from ragcoach.infrastructure.db.search_cache import CollectionVersions
+    from ragcoach.infrastructure.settings import settings
+
+    # The gateway reads the URL per call; endpoints look up the module-level service per call.
+    settings.ollama_url = f"http://127.0.0.1:{ollama_port}"
+    # Keep uploads, the upload registry, the dedup index, chunk texts, collection versions and
+    # extracted pages out of the repository's data directory.
+    api.service = QdrantService(
+        qdrant_url=":memory:",
+        embedder=None if args.real_embeddings else HashingEmbedder(),
+        dedup_index=work_dir / "dedup_index.sqlite",
+        chunk_store_path=work_dir / "chunk_store.sqlite",
+        collection_versions=CollectionVersions(work_dir / "collection_versions.sqlite"),
+    )
+    api.UPLOAD_DIR = work_dir / "uploads"
+    api.JSON_DIR = work_dir / "json"
+    api.registry = IngestRegistry(work_dir / "ingest_registry.sqlite")
+    # Uploads extract every PDF by default, so their latency includes parsing, not cache hits.
+    api.page_cache = PageCache(args.page_cache) if args.page_cache else None
+    api.use_page_cache = api.page_cache is not None
+
+    seed_collection(api.service, Path(args.pdf_dir), api.page_cache)
+
+    api_port = free_port()
+    api_server = serve_in_thread(api.app, api_port)
+    return f"http://127.0.0.1:{api_port}", [api_server, ollama]
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    latency: float
+    ok: bool
+    # 429 from LLM admission control: load was shed, not failed.
+    shed: bool = False
+
+
+@dataclass
+class Traffic:
+    questions: list[str]
+    pdfs: list[Path]
+    weights: dict[str, float]
+    fast_grade_share: float = 0.0
+    # Send every upload to a new collection so the ingest registry and the dedup index never
+    # turn a repeated PDF into a no-op: each sample pays for extraction, embedding and upsert.
+    fresh_uploads: bool = True
+    samples: list[Sample] = field(default_factory=list)
+
+    def pick(self, rng: random.Random) -> str:
+        names = [name for name, weight in self.weights.items() if weight > 0]
+        return rng.choices(names, weights=[self.weights[n] for n in names])[0]
+
+
+async def send(
+    client: httpx.AsyncClient, endpoint: str, traffic: Traffic, rng: random.Random
+) -> tuple[str, httpx.Response]:
+    """Send one request; returns the label it is reported under and the response."""
+    question = rng.choice(traffic.questions)
+    if endpoint == "random_question":
+        return endpoint, await client.get("/api/random_question")
+    if endpoint == "search":
+        return endpoint, await client.post("/api/search", json={"question": question, "top_k": 5})
+    if endpoint == "grade":
+        fast = rng.random() < traffic.fast_grade_share
+        body = {
+            "question": question,
+            "student_answer": "Это способ решения задачи, который описан в лекции, с примером.",
+            "lecture_snippet": question,
+            "fast": fast,
+        }
+        return ("grade_fast" if fast else endpoint), await client.post("/api/grade", json=body)
+    if endpoint == "evaluate":
+        return endpoint, await client.post("/api/evaluate", json={"prompt": question})
+    pdf = rng.choice(traffic.pdfs)
+    with pdf.open("rb") as fh:
+        files = {"files": (pdf.name, fh.read(), "application/pdf")}
+    data = {"chunk_words": "150"}
+    if traffic.fresh_uploads:
+        data["collection"] = f"load_upload_{uuid.uuid4().hex[:12]}"
+    return endpoint, await client.post("/api/upload_pdfs", files=files, data=data)
+
+
+async def user_loop(client: httpx.AsyncClient, traffic: Traffic, stop_at: float, seed: int) -> None:
+    rng = random.Random(seed)
+    while time.monotonic() < stop_at:
+        endpoint = traffic.pick(rng)
+        started = time.perf_counter()
+        shed = False
+        try:
+            endpoint, response = await send(client, endpoint, traffic, rng)
+            ok = response.status_code < 400
+            shed = response.status_code == 429
+        except httpx.HTTPError:
+            ok = False
+        traffic.samples.append(Sample(endpoint, time.perf_counter() - started, ok, shed))
+        if shed:
+            # Honour Retry-After like a well-behaved client instead of hammering the queue.
+            retry_after = float(response.headers.get("Retry-After", "1"))
+            await asyncio.sleep(min(retry_after, max(0.0, stop_at - time.monotonic())))
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: list[Sample], duration: float) -> dict[str, dict]:
+    grouped: dict[str, list[Sample]] = defaultdict(list)
+    for sample in samples:
+        grouped[sample.endpoint].append(sample)
+        grouped["total"].append(sample)
+    report = {}
+    for endpoint, rows in grouped.items():
+        latencies = [s.latency for s in rows]
+        errors = sum(1 for s in rows if not s.ok and not s.shed)
+        report[endpoint] = {
+            "requests": len(rows),
+            "rps": len(rows) / duration,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "error_rate": errors / len(rows),
+            "shed_rate": sum(1 for s in rows if s.shed) / len(rows),
+        }
+    return report
+
+
+def print_level(concurrency: int, report: dict[str, dict]) -> None:
+    print(f"\n== concurrency {concurrency} ==")
+    print(
+        f"{'endpoint':<16} {'req':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err %':>7} {'429 %':>7}"
+    )
+    for endpoint in sorted(report, key=lambda name: (name == "total", name)):
+        row = report[endpoint]
+        print(
+            f"{endpoint:<16} {row['requests']:>6} {row['rps']:>8.2f} {row['p50_ms']:>9.1f} "
+            f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['error_rate'] * 100:>7.1f} {row['shed_rate'] * 100:>7.1f}"
+        )
+
+
+async def run_ramp(base_url: str, traffic: Traffic, levels: list[int], duration: float, timeout: float) -> list[dict]:
+    results = []
+    limits = httpx.Limits(max_connections=max(levels) * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        for concurrency in levels:
+            traffic.samples = []
+            stop_at = time.monotonic() + duration
+            started = time.perf_counter()
+            await asyncio.gather(*(user_loop(client, traffic, stop_at, seed) for seed in range(concurrency)))
+            report = summarize(traffic.samples, time.perf_counter() - started)
+            print_level(concurrency, report)
+            results.append({"concurrency": concurrency, "endpoints": report})
+    return results
+
+
+def saturation_point(results: list[dict], tolerance: float = 0.05) -> int | None:
+    """First concurrency level after which total throughput stops growing by more than ``tolerance``."""
+    best_rps = 0.0
+    best_level = None
+    for level in results:
+        rps = level["endpoints"].get("total", {}).get("rps", 0.0)
+        if rps > best_rps * (1 + tolerance):
+            best_rps, best_level = rps, level["concurrency"]
+    return best_level
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the RAGCoach API against fake Ollama and in-memory Qdrant")
+    parser.add_argument("--target", default=None, help="Drive an already running API instead of the offline stack")
+    parser.add_argument(
+        "--fresh-uploads",
+        action="store_true",
+        help="With --target, send each upload to a new load_upload_* collection (always on offline)",
+    )
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per concurrency level")
+    parser.add_argument("--timeout", type=float, default=180.0, help="Client timeout per request, seconds")
+    parser.add_argument("--mix", default="random_question=0.3,search=0.35,grade=0.3,upload=0.05",
+                        help="Traffic weights per endpoint (random_question, search, grade, evaluate, upload)")
+    parser.add_argument("--fast-grade-share", type=float, default=0.0, help="Share of grade requests sent with fast=true")
+    parser.add_argument("--questions-file", default=str(DATA_DIR / "questions.txt"), help="Questions to sample from")
+    parser.add_argument("--pdf-dir", default=str(DATA_DIR / "lections"), help="PDFs used for upload traffic")
+    parser.add_argument("--ollama-tokens-per-sec", type=float, default=40.0, help="Fake Ollama decode speed")
+    parser.add_argument("--ollama-tokens", type=int, default=120, help="Tokens per fake completion")
+    parser.add_argument("--ollama-ttft", type=float, default=0.15, help="Fake prompt processing delay, seconds")
+    parser.add_argument("--ollama-parallel", type=int, default=1, help="Fake Ollama parallel slots (OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--real-embeddings", action="store_true", help="Use the real embedding model instead of hashing")
+    parser.add_argument(
+        "--page-cache", default=None, help="Page cache file for uploads (default: extract every upload, no cache)"
+    )
+    parser.add_argument("--json-out", default=None, help="Write the full report as JSON")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    weights = {name: float(weight) for name, weight in (item.split("=") for item in args.mix.split(",") if item)}
+    questions_path = Path(args.questions_file)
+    questions = [q.strip() for q in questions_path.read_text(encoding="utf-8").splitlines() if q.strip()]
+    pdfs = sorted(Path(args.pdf_dir).glob("*.pdf"))
+    if not pdfs:
+        weights["upload"] = 0.0
+    traffic = Traffic(
+        questions=questions,
+        pdfs=pdfs,
+        weights=weights,
+        fast_grade_share=args.fast_grade_share,
+        # A running API keeps its collections; do not litter its Qdrant with throwaway ones.
+        fresh_uploads=args.target is None or args.fresh_uploads,
+    )
+    levels = [int(n) for n in args.concurrency.split(",") if n.strip()]
+
+    with tempfile.TemporaryDirectory(prefix="ragcoach-load-") as tmp:
+        servers: list[uvicorn.Server] = []
+        if args.target:
+            base_url = args.target.rstrip("/")
+        else:
+            base_url, servers = start_stack(args, Path(tmp))
+        try:
+            results = asyncio.run(run_ramp(base_url, traffic, levels, args.duration, args.timeout))
+        finally:
+            for server in servers:
+                server.should_exit = True
+
+    peak = saturation_point(results)
+    if peak is not None:
+        print(f"\nThroughput stops scaling after concurrency {peak}.")
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Report written to {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
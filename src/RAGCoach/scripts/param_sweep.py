@@ -0,0 +1,323 @@
+"""Sweep ingest/retrieval parameters and report their cost against retrieval quality.
+
+Every (model, chunk_words, chunk_overlap) combination is ingested once into its own
+``sweep_<n>`` collection on the QDRANT_URL server (``--qdrant-url :memory:`` runs in-process,
+but then search latency is a brute-force scan, not HNSW); every top_k is then queried with the
+questions file. Per combination the sweep reports ingest seconds, vector count, index
+bytes (vectors + payloads held by Qdrant), chunk text bytes, search p50/p95, words of
+context handed to the LLM and agreement with a reference configuration: the share of the
+reference hits' (source, page) pairs that the combination also returns, per question.
+
+    python -m ragcoach.scripts.param_sweep --chunk-words 100,150,200 --overlap 0,30 --top-k 3,5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+
+from ragcoach.infrastructure.db import PageCache, QdrantService, iter_pdf_pages
+from ragcoach.infrastructure.db.qdrant_service import DEFAULT_MODEL, DEFAULT_QDRANT_URL
+from ragcoach.infrastructure.db.search_cache import CollectionVersions
+
+
+COST_KEYS = ("index_bytes", "search_p95_ms", "context_words", "ingest_seconds")
+
+
+@dataclass(frozen=True)
+class SweepConfig:
+    model: str
+    chunk_words: int
+    chunk_overlap: int
+    top_k: int
+
+    @property
+    def label(self) -> str:
+        return f"{self.model} words={self.chunk_words} overlap={self.chunk_overlap} k={self.top_k}"
+
+    @property
+    def valid(self) -> bool:
+        """``chunk_text`` needs ``0 <= overlap < words``; top_k must be positive."""
+        return 0 <= self.chunk_overlap < self.chunk_words and self.top_k > 0
+
+
+@dataclass
+class SweepResult:
+    config: SweepConfig
+    ingest_seconds: float
+    vectors: int
+    index_bytes: int
+    text_bytes: int
+    search_p50_ms: float
+    search_p95_ms: float
+    context_words: float
+    agreement: float | None = None
+    # (source, page) pairs returned per question; used for agreement, not reported.
+    hits: list[set[tuple[str, str]]] = field(default_factory=list, repr=False)
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data.pop("hits")
+        return data
+
+
+def load_questions(path: Path) -> list[str]:
+    lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
+    return [line.strip() for line in lines if line.strip()]
+
+
+def load_corpus(
+    pdf_dir: Path, pages_files: list[Path], page_cache: PageCache | None = None
+) -> dict[str, list[tuple[str, str]]]:
+    """Pages per source, extracted once so every combination ingests the same text.
+
+    PDFs are read through ``page_cache`` when given and never touch the default cache.
+    """
+    if pages_files:
+        return {path.stem: list(QdrantService.load_pages(path)) for path in pages_files}
+    pdf_files = sorted(pdf_dir.expanduser().resolve().glob("*.pdf"))
+    if not pdf_files:
+        raise FileNotFoundError(f"No PDF files found in {pdf_dir}")
+    return {
+        path.stem: list(iter_pdf_pages(str(path), cache=page_cache, use_cache=page_cache is not None))
+        for path in pdf_files
+    }
+
+
+def parse_list(value: str, cast=str) -> list:
+    return [cast(item.strip()) for item in value.split(",") if item.strip()]
+
+
+def build_index(
+    model: str,
+    chunk_words: int,
+    chunk_overlap: int,
+    corpus: dict[str, list[tuple[str, str]]],
+    collection: str,
+    work_dir: Path,
+    qdrant_url: str,
+    qdrant_api_key: str | None,
+) -> tuple[QdrantService, float]:
+    service = QdrantService(
+        collection=collection,
+        embedding_model=model,
+        chunk_words=chunk_words,
+        chunk_overlap=chunk_overlap,
+        qdrant_url=qdrant_url,
+        qdrant_api_key=qdrant_api_key,
+        dedup_index=work_dir / "dedup_index.sqlite",
+        chunk_store_path=work_dir / "chunk_store.sqlite",
+        collection_versions=CollectionVersions(work_dir / "collection_versions.sqlite"),
+        # Latencies must reflect real searches, not cache hits.
+        search_cache=None,
+    )
+    service.clear_collection()
+    # Model loading is a one-off cost; keep it out of the ingest timing.
+    service.embedder.encode(["warm-up"])
+    started = time.perf_counter()
+    for source, pages in corpus.items():
+        service.ingest_pages(pages, source=source)
+    return service, time.perf_counter() - started
+
+
+def run_queries(
+    service: QdrantService, questions: list[str], top_k: int
+) -> tuple[list[float], list[set[tuple[str, str]]], float]:
+    # Warm-up: the first query pays for lazy client/collection setup.
+    service.search(questions[0], top_k=top_k)
+    latencies: list[float] = []
+    hits: list[set[tuple[str, str]]] = []
+    context_words = 0
+    for question in questions:
+        started = time.perf_counter()
+        results = service.search(question, top_k=top_k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        pages = set()
+        for hit in results:
+            payload = hit["payload"]
+            pages.add((str(payload.get("source")), str(payload.get("page"))))
+            context_words += len(payload.get("text", "").split())
+        hits.append(pages)
+    return latencies, hits, context_words / len(questions)
+
+
+def agreement(candidate: list[set], reference: list[set]) -> float:
+    scores = [len(c & r) / len(r) for c, r in zip(candidate, reference) if r]
+    return float(np.mean(scores)) if scores else 0.0
+
+
+def sweep(
+    configs: list[SweepConfig],
+    reference: SweepConfig,
+    corpus: dict[str, list[tuple[str, str]]],
+    questions: list[str],
+    qdrant_url: str,
+    qdrant_api_key: str | None = None,
+    keep_collections: bool = False,
+) -> list[SweepResult]:
+    invalid = [config.label for config in (reference, *configs) if not config.valid]
+    if invalid:
+        # Fail before the first ingest instead of in chunk_text halfway through the sweep.
+        raise ValueError(f"Invalid sweep configurations (need 0 <= overlap < chunk words, top_k > 0): {invalid}")
+    if reference not in configs:
+        configs = [reference, *configs]
+    by_index: dict[tuple[str, int, int], list[SweepConfig]] = {}
+    for config in configs:
+        by_index.setdefault((config.model, config.chunk_words, config.chunk_overlap), []).append(config)
+
+    results: list[SweepResult] = []
+    with tempfile.TemporaryDirectory(prefix="ragcoach-sweep-") as tmp:
+        for number, ((model, chunk_words, overlap), index_configs) in enumerate(by_index.items()):
+            collection = f"sweep_{number}"
+            print(f"[+] Ingesting {model} words={chunk_words} overlap={overlap} into '{collection}'")
+            service, ingest_seconds = build_index(
+                model, chunk_words, overlap, corpus, collection, Path(tmp), qdrant_url, qdrant_api_key
+            )
+            stats = service.storage_stats()
+            for config in index_configs:
+                latencies, hits, context_words = run_queries(service, questions, config.top_k)
+                results.append(
+                    SweepResult(
+                        config=config,
+                        ingest_seconds=ingest_seconds,
+                        vectors=stats["vectors"],
+                        index_bytes=stats["vector_bytes"] + stats["payload_bytes"],
+                        text_bytes=stats["text_bytes"],
+                        search_p50_ms=float(np.percentile(latencies, 50)),
+                        search_p95_ms=float(np.percentile(latencies, 95)),
+                        context_words=context_words,
+                        hits=hits,
+                    )
+                )
+            if not keep_collections:
+                service.clear_collection()
+
+    reference_hits = next(result.hits for result in results if result.config == reference)
+    for result in results:
+        result.agreement = agreement(result.hits, reference_hits)
+    return results
+
+
+def print_table(results: list[SweepResult], reference: SweepConfig, in_memory: bool = False) -> None:
+    header = (
+        f"{'model':<28} {'words':>5} {'ovl':>4} {'k':>3} {'ingest s':>9} {'vectors':>8} "
+        f"{'index KiB':>10} {'text KiB':>9} {'p50 ms':>7} {'p95 ms':>7} {'ctx words':>9} {'agree':>6}"
+    )
+    print(header)
+    for result in results:
+        config = result.config
+        marker = " *" if config == reference else ""
+        print(
+            f"{config.model[-28:]:<28} {config.chunk_words:>5} {config.chunk_overlap:>4} {config.top_k:>3} "
+            f"{result.ingest_seconds:>9.2f} {result.vectors:>8} {result.index_bytes / 1024:>10.1f} "
+            f"{result.text_bytes / 1024:>9.1f} {result.search_p50_ms:>7.1f} {result.search_p95_ms:>7.1f} "
+            f"{result.context_words:>9.0f} {result.agreement:>6.2f}{marker}"
+        )
+    print("* reference configuration")
+    if in_memory:
+        print("p50/p95 were timed against in-process Qdrant (brute-force scan, no HNSW) and do not predict a server")
+
+
+def cheapest(results: list[SweepResult], min_agreement: float, cost: str) -> SweepResult | None:
+    eligible = [result for result in results if (result.agreement or 0.0) >= min_agreement]
+    return min(eligible, key=lambda result: getattr(result, cost), default=None)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sweep chunking/model/top_k and report cost vs. retrieval agreement")
+    parser.add_argument("--pdf-dir", default="data/lections", help="Lecture PDFs to ingest")
+    parser.add_argument(
+        "--pages", nargs="*", default=[], help="pdf_to_json/pdf_to_jsonl outputs to use instead of extracting PDFs"
+    )
+    parser.add_argument("--questions-file", default="data/questions.txt", help="Queries, one per line")
+    parser.add_argument("--models", default=DEFAULT_MODEL, help="Comma-separated embedding models")
+    parser.add_argument("--chunk-words", default="100,150,200", help="Comma-separated chunk sizes in words")
+    parser.add_argument("--overlap", default="0", help="Comma-separated chunk overlaps in words")
+    parser.add_argument("--top-k", default="3,5,8", help="Comma-separated top_k values")
+    parser.add_argument(
+        "--reference",
+        default=None,
+        help="Reference as model,chunk_words,overlap,top_k (default: first model, 150 words, no overlap, k=5)",
+    )
+    parser.add_argument("--min-agreement", type=float, default=0.8, help="Quality bar for the recommendation")
+    parser.add_argument("--cost", choices=COST_KEYS, default="index_bytes", help="What 'cheapest' minimises")
+    parser.add_argument(
+        "--qdrant-url",
+        default=DEFAULT_QDRANT_URL,
+        help="Qdrant URL (defaults to QDRANT_URL); ':memory:' runs in-process without representative search latency",
+    )
+    parser.add_argument("--qdrant-api-key", default=None, help="Qdrant API key")
+    parser.add_argument("--page-cache", default=None, help="Page cache file to extract PDFs through (default: none)")
+    parser.add_argument("--keep-collections", action="store_true", help="Do not drop the sweep_* collections")
+    parser.add_argument("--json-out", default=None, help="Write all rows as JSON to this path")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    models = parse_list(args.models)
+    if args.reference:
+        model, words, overlap, top_k = parse_list(args.reference)
+        reference = SweepConfig(model, int(words), int(overlap), int(top_k))
+    else:
+        reference = SweepConfig(models[0], 150, 0, 5)
+    if not reference.valid:
+        raise ValueError(f"Invalid --reference {reference.label}: need 0 <= overlap < chunk words and top_k > 0")
+    combinations = [
+        SweepConfig(model, words, overlap, top_k)
+        for model, words, overlap, top_k in product(
+            models,
+            parse_list(args.chunk_words, int),
+            parse_list(args.overlap, int),
+            parse_list(args.top_k, int),
+        )
+    ]
+    configs = [config for config in combinations if config.valid]
+    dropped = sorted({(config.chunk_words, config.chunk_overlap) for config in combinations if not config.valid})
+    if dropped:
+        skipped = ", ".join(f"words={words} overlap={overlap}" for words, overlap in dropped)
+        print(f"Warning: skipping combinations with overlap >= chunk words or top_k < 1: {skipped}")
+
+    in_memory = args.qdrant_url == ":memory:"
+    if in_memory and args.cost == "search_p95_ms":
+        raise ValueError("--cost search_p95_ms needs a Qdrant server; in-process search latency is not representative")
+
+    questions = load_questions(Path(args.questions_file))
+    if not questions:
+        raise ValueError(f"No questions in {args.questions_file}")
+    page_cache = PageCache(args.page_cache) if args.page_cache else None
+    corpus = load_corpus(Path(args.pdf_dir), [Path(path) for path in args.pages], page_cache)
+    print(f"Corpus: {len(corpus)} sources, {sum(len(p) for p in corpus.values())} pages; {len(questions)} questions")
+
+    results = sweep(
+        configs,
+        reference,
+        corpus,
+        questions,
+        qdrant_url=args.qdrant_url,
+        qdrant_api_key=args.qdrant_api_key,
+        keep_collections=args.keep_collections,
+    )
+    print_table(results, reference, in_memory)
+
+    best = cheapest(results, args.min_agreement, args.cost)
+    if best is None:
+        print(f"No configuration reaches agreement >= {args.min_agreement:.2f}")
+    else:
+        print(f"Cheapest by {args.cost} with agreement >= {args.min_agreement:.2f}: {best.config.label}")
+
+    if args.json_out:
+        Path(args.json_out).write_text(
+            json.dumps([result.as_dict() for result in results], ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        print(f"Wrote {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Export a Qdrant collection to local files or restore it without re-embedding.
+
+    python -m ragcoach.scripts.snapshot export --dir backups/lectures
+    python -m ragcoach.scripts.snapshot import --dir backups/lectures --collection lectures_restored
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from ragcoach.infrastructure.db import QdrantService
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Collection snapshot export/import (.npy vectors + JSONL payloads)")
+    parser.add_argument("command", choices=("export", "import"))
+    parser.add_argument("--dir", required=True, help="Snapshot directory")
+    parser.add_argument("--collection", default=None, help="Qdrant collection name")
+    parser.add_argument("--embedding-model", default=None, help="Embedding model the collection was built with")
+    parser.add_argument("--qdrant-url", default=None, help="Qdrant URL")
+    parser.add_argument("--qdrant-api-key", default=None, help="Qdrant API key")
+    parser.add_argument("--batch-size", type=int, default=1024, help="Points per scroll/upload batch")
+    parser.add_argument("--parallel", type=int, default=4, help="Parallel upload workers on import")
+    parser.add_argument("--recreate", action="store_true", help="Drop an existing target collection on import")
+    parser.add_argument("--skip-model-check", action="store_true", help="Import even if the embedding model differs")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    service_kwargs = {
+        "collection": args.collection,
+        "qdrant_url": args.qdrant_url,
+        "qdrant_api_key": args.qdrant_api_key,
+    }
+    if args.embedding_model:
+        service_kwargs["embedding_model"] = args.embedding_model
+    service = QdrantService(**service_kwargs)
+
+    started = time.perf_counter()
+    if args.command == "export":
+        manifest = service.export_snapshot(args.dir, batch_size=args.batch_size)
+        print(
+            f"Exported {manifest['count']} points from '{service.collection}' to {args.dir} "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+    else:
+        count = service.import_snapshot(
+            args.dir,
+            batch_size=args.batch_size,
+            parallel=args.parallel,
+            recreate=args.recreate,
+            check_model=not args.skip_model_check,
+        )
+        print(f"Imported {count} points into '{service.collection}' in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from ragcoach.infrastructure.db import QdrantService
+from ragcoach.infrastructure.db.search_cache import CollectionVersions, SearchCache
+from ragcoach.scripts.load_test import HashingEmbedder
+
+
+def random_pages(count: int, words: int = 300, seed: int = 0) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    return [
+        (f"page_{i + 1}", " ".join("".join(rng.choice("abcdefghij") for _ in range(6)) for _ in range(words)))
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def make_service(tmp_path):
+    """In-memory Qdrant with hashed embeddings; every local store lives in ``tmp_path``."""
+
+    def factory(**overrides) -> QdrantService:
+        options = dict(
+            collection="lectures",
+            qdrant_url=":memory:",
+            embedder=HashingEmbedder(dim=64),
+            dedup_index=tmp_path / "dedup_index.sqlite",
+            chunk_store_path=tmp_path / "chunk_store.sqlite",
+            collection_versions=CollectionVersions(tmp_path / "collection_versions.sqlite"),
+            search_cache=SearchCache(),
+            compact_dim=0,
+        )
+        options.update(overrides)
+        return QdrantService(**options)
+
+    return factory
@@ -0,0 +1,59 @@
+from ragcoach.infrastructure.db.dedup import ChunkDeduplicator, simhash, text_digest, tokenize
+
+from conftest import random_pages
+
+URL = "http://localhost:6333"
+OTHER_URL = "http://backup:6333"
+
+
+def _text(seed: int = 0) -> str:
+    # Long enough that appending a word moves the SimHash by at most a bit or two.
+    return random_pages(1, words=300, seed=seed)[0][1]
+
+
+def test_exact_digest_ignores_case_and_whitespace_but_keeps_numbers():
+    assert text_digest("Table  1:\nValue") == text_digest("table 1: value")
+    assert text_digest("x = 10") != text_digest("x = 20")
+
+
+def test_simhash_ignores_page_numbers():
+    header = "Lecture 3 introduction to databases page 12 of the course notes"
+    assert simhash(tokenize(header)) == simhash(tokenize(header.replace("12", "13")))
+    assert simhash(tokenize(_text(0))) != simhash(tokenize(_text(1)))
+
+
+def test_classify_detects_exact_and_near_duplicates_within_a_batch(tmp_path):
+    dedup = ChunkDeduplicator(tmp_path / "dedup.sqlite")
+    text = _text()
+    near = text + " extra"
+    assert dedup.classify(URL, "lectures", [text, text.upper(), near, _text(1)]) == [None, "exact", "near", None]
+
+
+def test_signatures_persist_and_are_scoped_by_qdrant_url_and_collection(tmp_path):
+    path = tmp_path / "dedup.sqlite"
+    text = _text()
+    ChunkDeduplicator(path).remember(URL, "lectures", [text])
+
+    reopened = ChunkDeduplicator(path)
+    assert reopened.classify(URL, "lectures", [text, text + " extra"]) == ["exact", "near"]
+    assert reopened.classify(URL, "other", [text]) == [None]
+    assert reopened.classify(OTHER_URL, "lectures", [text]) == [None]
+
+    reopened.forget_collection(OTHER_URL, "lectures")
+    assert reopened.classify(URL, "lectures", [text]) == ["exact"]
+    reopened.forget_collection(URL, "lectures")
+    assert reopened.classify(URL, "lectures", [text]) == [None]
+
+
+def test_reingest_drops_every_chunk_and_recreated_collection_accepts_them(make_service):
+    service = make_service()
+    pages = random_pages(4)
+    first = service.ingest_pages(pages, source="lecture")
+    assert first.inserted > 0
+
+    again = service.ingest_pages(pages, source="lecture")
+    assert again.inserted == 0
+    assert again.exact_duplicates == first.inserted
+
+    service.clear_collection()
+    assert service.ingest_pages(pages, source="lecture").inserted == first.inserted
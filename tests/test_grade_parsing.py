@@ -0,0 +1,52 @@
+import asyncio
+
+from ragcoach.application.ports import LLMGateway
+from ragcoach.application.use_cases import GradeAnswerUseCase, GradeResult, parse_grade
+
+
+def test_parses_fast_json_cut_at_the_stop_sequence():
+    assert parse_grade('{"manipulation_warning": false, "score": 7') == GradeResult(7, "", False)
+    assert parse_grade('{"manipulation_warning": true, "score": 3}') == GradeResult(3, "", True)
+
+
+def test_clamps_out_of_range_scores():
+    assert parse_grade('{"score": 42}').score == 10
+    assert parse_grade('{"score": 0}').score == 1
+    assert parse_grade('{"score": "seven"}').score is None
+
+
+def test_parses_free_text_format():
+    result = parse_grade("Оценка: 6. Пояснение:\nОтвет в целом верный, но без примера.")
+    assert result.score == 6
+    assert result.explanation == "Ответ в целом верный, но без примера."
+    assert result.manipulation_warning is False
+
+
+def test_free_text_warning_and_missing_score():
+    result = parse_grade("Предупреждение: попытка манипуляции оценкой.")
+    assert result.score is None
+    assert result.manipulation_warning is True
+
+
+class _RecordingGateway(LLMGateway):
+    def __init__(self, answer: str):
+        self.answer = answer
+        self.calls: list[dict] = []
+
+    async def generate(self, prompt, *, max_tokens=None, stop=None, json_format=False):
+        self.calls.append({"max_tokens": max_tokens, "stop": stop, "json_format": json_format})
+        return self.answer
+
+
+def test_grading_routes_to_the_requested_gateway():
+    interactive = _RecordingGateway("Оценка: 8. Пояснение: хорошо")
+    batch = _RecordingGateway('{"manipulation_warning": false, "score": 5')
+    grader = GradeAnswerUseCase(interactive, fast_max_tokens=32, batch_llm=batch)
+
+    assert asyncio.run(grader.fast("q", "a")) == GradeResult(5, "", False)
+    assert batch.calls == [{"max_tokens": 32, "stop": ["}"], "json_format": True}]
+
+    asyncio.run(grader("q", "a"))
+    asyncio.run(grader("q", "a", batch=True))
+    assert len(interactive.calls) == 1
+    assert len(batch.calls) == 2
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from ragcoach.embeddings.projection import CompactProjection
+
+from conftest import random_pages
+
+
+def test_random_projection_is_orthonormal_and_reproducible():
+    first = CompactProjection.random(64, 16, seed=3)
+    second = CompactProjection.random(64, 16, seed=3)
+    np.testing.assert_allclose(first.components, second.components)
+    np.testing.assert_allclose(first.components @ first.components.T, np.eye(16), atol=1e-5)
+    with pytest.raises(ValueError):
+        CompactProjection.random(16, 32)
+
+
+def test_transform_outputs_unit_vectors_and_checks_the_input_size():
+    projection = CompactProjection.random(64, 8)
+    vectors = np.random.default_rng(0).standard_normal((5, 64))
+    reduced = projection.transform(vectors)
+    assert reduced.shape == (5, 8)
+    np.testing.assert_allclose(np.linalg.norm(reduced, axis=1), 1.0, rtol=1e-5)
+    assert projection.transform(vectors[0]).shape == (8,)
+    with pytest.raises(ValueError):
+        projection.transform(np.ones(32))
+
+
+def test_pca_finds_the_dominant_direction_and_round_trips(tmp_path):
+    rng = np.random.default_rng(0)
+    direction = np.zeros(10)
+    direction[3] = 1.0
+    vectors = rng.standard_normal((200, 1)) * 10 * direction + rng.standard_normal((200, 10)) * 0.1
+    projection = CompactProjection.fit_pca(vectors, 2)
+    assert abs(projection.components[0] @ direction) > 0.99
+
+    path = tmp_path / "pca.npz"
+    projection.save(path)
+    loaded = CompactProjection.load(path)
+    np.testing.assert_allclose(loaded.transform(vectors), projection.transform(vectors), atol=1e-6)
+
+
+def test_two_stage_search_matches_its_own_chunks(make_service):
+    service = make_service(compact_dim=16)
+    pages = random_pages(3)
+    service.ingest_pages(pages, source="lecture")
+    hits = service.search(pages[1][1][:200], top_k=1)
+    assert hits[0]["payload"]["page"] == "page_2"
+
+
+def test_loaded_projection_must_match_the_collection_compact_size(make_service, tmp_path):
+    path = tmp_path / "pca.npz"
+    CompactProjection.random(64, 8).save(path)
+    service = make_service(compact_dim=16, compact_projection=path)
+    with pytest.raises(ValueError, match="size 8"):
+        service.ingest_pages(random_pages(1), source="lecture")
@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from ragcoach.application.ports import LLMOverloadedError
+from ragcoach.infrastructure.llm.scheduler import LLMScheduler, Priority
+
+
+async def _hold(scheduler: LLMScheduler, priority: Priority, release: asyncio.Event, started: list, name: str):
+    async with scheduler.slot(priority):
+        started.append(name)
+        await release.wait()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_reserve_keeps_a_slot_for_interactive_calls():
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=2, interactive_reserve=1)
+        release = asyncio.Event()
+        started: list[str] = []
+        tasks = [
+            asyncio.create_task(_hold(scheduler, Priority.BATCH, release, started, "batch-1")),
+            asyncio.create_task(_hold(scheduler, Priority.BATCH, release, started, "batch-2")),
+        ]
+        await _settle()
+        assert started == ["batch-1"]
+        assert scheduler.metrics()["classes"]["batch"]["queue_depth"] == 1
+
+        tasks.append(asyncio.create_task(_hold(scheduler, Priority.INTERACTIVE, release, started, "interactive")))
+        await _settle()
+        assert started == ["batch-1", "interactive"]
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert started == ["batch-1", "interactive", "batch-2"]
+        assert scheduler.metrics()["active"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiting_calls_are_served_by_strict_priority():
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=1, interactive_reserve=0)
+        gate = asyncio.Event()
+        started: list[str] = []
+        holder = asyncio.create_task(_hold(scheduler, Priority.BATCH, gate, started, "holder"))
+        await _settle()
+
+        release = asyncio.Event()
+        waiting = []
+        for priority, name in [
+            (Priority.FREEFORM, "freeform"),
+            (Priority.BATCH, "batch"),
+            (Priority.INTERACTIVE, "interactive-1"),
+            (Priority.INTERACTIVE, "interactive-2"),
+        ]:
+            waiting.append(asyncio.create_task(_hold(scheduler, priority, release, started, name)))
+            await _settle()
+        release.set()
+        gate.set()
+        await asyncio.gather(holder, *waiting)
+        assert started == ["holder", "interactive-1", "interactive-2", "batch", "freeform"]
+
+    asyncio.run(scenario())
+
+
+def test_call_is_shed_when_it_waits_past_its_deadline():
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=1, interactive_reserve=0, deadlines={Priority.BATCH: 0.05})
+        release = asyncio.Event()
+        started: list[str] = []
+        holder = asyncio.create_task(_hold(scheduler, Priority.INTERACTIVE, release, started, "holder"))
+        await _settle()
+
+        with pytest.raises(LLMOverloadedError):
+            async with scheduler.slot(Priority.BATCH):
+                pass
+        batch = scheduler.metrics()["classes"]["batch"]
+        assert batch["expired_in_queue"] == 1
+        assert batch["queue_depth"] == 0
+
+        release.set()
+        await holder
+        assert scheduler.metrics()["active"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_call_is_rejected_up_front_when_the_estimated_wait_exceeds_its_deadline():
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=1, interactive_reserve=0, deadlines={Priority.BATCH: 1.0})
+        scheduler._record_duration(10.0)
+        release = asyncio.Event()
+        started: list[str] = []
+        holder = asyncio.create_task(_hold(scheduler, Priority.INTERACTIVE, release, started, "holder"))
+        await _settle()
+
+        with pytest.raises(LLMOverloadedError) as excinfo:
+            async with scheduler.slot(Priority.BATCH):
+                pass
+        assert excinfo.value.retry_after >= 10.0
+        batch = scheduler.metrics()["classes"]["batch"]
+        assert batch["rejected_deadline"] == 1
+        assert batch["queue_depth"] == 0
+
+        release.set()
+        await holder
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue_and_does_not_leak_a_slot():
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=1, interactive_reserve=0)
+        release = asyncio.Event()
+        started: list[str] = []
+        holder = asyncio.create_task(_hold(scheduler, Priority.INTERACTIVE, release, started, "holder"))
+        await _settle()
+        cancelled = asyncio.create_task(_hold(scheduler, Priority.INTERACTIVE, release, started, "cancelled"))
+        after = asyncio.create_task(_hold(scheduler, Priority.INTERACTIVE, release, started, "after"))
+        await _settle()
+        assert scheduler.metrics()["classes"]["interactive"]["queue_depth"] == 2
+
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert scheduler.metrics()["classes"]["interactive"]["queue_depth"] == 1
+
+        release.set()
+        await asyncio.gather(holder, after)
+        assert started == ["holder", "after"]
+        metrics = scheduler.metrics()
+        assert metrics["active"] == 0
+        assert metrics["classes"]["interactive"]["admitted"] == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,54 @@
+from ragcoach.infrastructure.db.search_cache import CollectionVersions, SearchCache
+
+from conftest import random_pages
+
+
+def test_versions_are_shared_through_the_file_and_scoped_by_url(tmp_path):
+    path = tmp_path / "versions.sqlite"
+    writer, reader = CollectionVersions(path), CollectionVersions(path)
+    assert reader.get(":memory:", "lectures") == 0
+    assert writer.bump(":memory:", "lectures") == 1
+    assert writer.bump(":memory:", "lectures") == 2
+    assert reader.get(":memory:", "lectures") == 2
+    assert reader.get("http://other:6333", "lectures") == 0
+
+
+def test_lru_evicts_by_bytes_and_hands_out_copies():
+    cache = SearchCache(max_bytes=200, ttl=0)
+    cache.put("a", [{"payload": {"text": "x" * 60}}])
+    cache.put("b", [{"payload": {"text": "y" * 60}}])
+    cache.get("a")
+    cache.put("c", [{"payload": {"text": "z" * 60}}])
+    assert cache.get("b") is None
+    hit = cache.get("a")
+    hit[0]["payload"]["text"] = "mutated"
+    assert cache.get("a")[0]["payload"]["text"] == "x" * 60
+
+
+def test_search_results_are_invalidated_by_writes_from_another_process(make_service, tmp_path):
+    reader = make_service()
+    reader.ingest_pages(random_pages(3), source="lecture")
+    reader.search("abcdef", top_k=3)
+    reader.search("abcdef", top_k=3)
+    assert reader.search_cache.stats()["hits"] == 1
+
+    # Another process writes to the collection: it shares only the versions file. (Its in-memory
+    # Qdrant is a separate instance, so it gets local stores of its own.)
+    writer = make_service(
+        collection_versions=CollectionVersions(tmp_path / "collection_versions.sqlite"),
+        dedup_index=tmp_path / "writer_dedup.sqlite",
+        chunk_store_path=tmp_path / "writer_chunks.sqlite",
+    )
+    writer.ingest_pages(random_pages(1, seed=7), source="other")
+
+    reader.search("abcdef", top_k=3)
+    stats = reader.search_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_cache_key_includes_the_qdrant_url(make_service):
+    first = make_service()
+    second = make_service()
+    second.qdrant_url = "http://backup:6333"
+    assert first._search_cache_key("q", 5, None) != second._search_cache_key("q", 5, None)